@@ -4,16 +4,23 @@ Supports both local Ollama and cloud APIs (DeepSeek, OpenAI, etc.)
 """
 
 import os
+import sys
 from pathlib import Path
-from typing import Optional, Literal
-from pydantic import BaseModel
+from typing import Any, Optional, Literal
+from pydantic import BaseModel, Field, PrivateAttr
 
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    pass  # python-dotenv not installed, use system env vars
+# Load environment variables from .env file (once per module; importlib.reload
+# keeps module globals, so a reload does not read it again)
+if not globals().get("_DOTENV_LOADED"):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass  # python-dotenv not installed, use system env vars
+    _DOTENV_LOADED = True
+
+# Project root, resolved once (folds symlinks) and shared by all path defaults
+_ROOT = Path(__file__).resolve().parent.parent
 
 
 class LLMSettings(BaseModel):
@@ -35,8 +42,39 @@ class LLMSettings(BaseModel):
     max_tokens: int = 4096
     temperature: float = 0.1
 
+    # Opt-in cache of rule evaluation responses by request content (None disables).
+    # Entries never expire; clear the directory after prompt or model changes.
+    rule_cache_dir: Optional[Path] = None
+    rule_cache_max_entries: int = 10_000  # Oldest responses are evicted beyond this
+
+    # Resolved values, filled on first access; see reload()
+    _resolved: dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    def reload(self):
+        """
+        Drop cached API key / base URL so the next access re-reads env vars.
+        The shared LLMClient copies them when built, so it is rebuilt too.
+        """
+        self._resolved.clear()
+        # Only if already imported; the gateway imports this module
+        gateway = sys.modules.get("eagleeye.gateway.ollama_client")
+        if gateway is not None:
+            gateway.LLMClient.reset()
+
     def get_api_key(self) -> Optional[str]:
-        """Get API key from config or environment variable."""
+        """Get API key from config or environment variable (cached)."""
+        if "api_key" not in self._resolved:
+            self._resolved["api_key"] = self._resolve_api_key()
+        return self._resolved["api_key"]
+
+    def get_base_url(self) -> str:
+        """Get base URL based on provider (cached)."""
+        if "base_url" not in self._resolved:
+            self._resolved["base_url"] = self._resolve_base_url()
+        return self._resolved["base_url"]
+
+    def _resolve_api_key(self) -> Optional[str]:
+        """Resolve API key from config or environment variable."""
         if self.api_key:
             return self.api_key
 
@@ -53,8 +91,8 @@ class LLMSettings(BaseModel):
 
         return None
 
-    def get_base_url(self) -> str:
-        """Get base URL based on provider."""
+    def _resolve_base_url(self) -> str:
+        """Resolve base URL based on provider."""
         default_urls = {
             "ollama": "http://localhost:11434/v1",
             "deepseek": "https://api.deepseek.com/v1",
@@ -76,8 +114,18 @@ class RAGSettings(BaseModel):
     collection_name: str = "eagleeye_rules"
     embedding_model: str = "BAAI/bge-small-zh-v1.5"
     embedding_dim: int = 512
+    embedding_dtype: Literal["float32", "float16", "int8"] = "float32"  # Local encoder precision
+    embedding_batch_size: int = 64  # Documents per encoder forward pass when indexing
+    index_workers: int = 2  # Processes parsing the rulebook when indexing (1 parses inline)
+    # "onnx" runs the encoder on onnxruntime via optimum (int8-quantized when
+    # embedding_dtype is "int8"); switching backends re-encodes the index
+    embedding_backend: Literal["sentence_transformers", "onnx"] = "sentence_transformers"
+    embedding_cache_dir: Optional[Path] = _ROOT / ".embedding_cache"  # Rule embeddings by content hash (None disables)
+    embedding_cache_max_entries: int = 100_000  # Oldest embeddings are evicted beyond this (one small file each)
     similarity_threshold: float = 0.35
     top_k: int = 5
+    query_cache_size: int = 512  # Exact-match semantic search results kept in memory
+    query_cache_similarity: float = 1.1  # Reuse hits of a recent query at least this similar (>1 disables)
     persist_directory: str = "./chroma_db"
 
 
@@ -85,29 +133,38 @@ class PDFSettings(BaseModel):
     """PDF parsing configuration."""
     text_density_threshold: int = 100  # chars per page for digital detection
     ocr_languages: list[str] = ["ch_sim", "en"]
-    ocr_gpu: bool = False  # CPU mode for Mac Mini
+    ocr_gpu: Optional[bool] = None  # None: use CUDA / Apple MPS when torch sees one
+    ocr_workers: int = 2  # OCR processes; each loads its own model (~1-2 GB), so keep small
     max_pages: Optional[int] = None
+    page_batch_size: int = 200  # Pages per pdfplumber window for digital PDFs (bounds peak memory; OCR is not windowed)
     dpi: int = 200  # For PDF to image conversion
+    ocr_scale: float = 1.0  # Render OCR pages at dpi * scale (e.g. 0.75 for ~44% fewer pixels)
+    ocr_grayscale: bool = True  # Render OCR pages as 8-bit grayscale instead of RGB
+    cache_dir: Optional[Path] = None  # Opt-in cache of parsed documents by file content (None disables)
+    cache_max_entries: int = 64  # Oldest parsed documents are evicted beyond this
 
 
 class AuditSettings(BaseModel):
     """Audit workflow configuration."""
     batch_size: int = 1  # Process one rule at a time (memory-efficient)
+    workers: int = 1  # Processes for batch rule evaluation (1 evaluates inline)
+    llm_fallback: bool = False  # Ask the LLM about rules whose schema lacks data
+    llm_concurrency: int = 16  # Max concurrent LLM requests (respects provider QPM limits)
     max_violations_per_rule: int = 10
     report_format: str = "markdown"  # markdown or json
 
 
 class Settings(BaseModel):
     """Main application settings."""
-    project_root: Path = Path(__file__).parent.parent
-    rulebook_path: Path = Path(__file__).parent.parent / "master_rulebook_v3.jsonl"
-    output_dir: Path = Path(__file__).parent.parent / "output"
+    project_root: Path = _ROOT
+    rulebook_path: Path = _ROOT / "master_rulebook_v3.jsonl"
+    output_dir: Path = _ROOT / "output"
     log_level: str = "INFO"
 
-    llm: LLMSettings = LLMSettings()
-    rag: RAGSettings = RAGSettings()
-    pdf: PDFSettings = PDFSettings()
-    audit: AuditSettings = AuditSettings()
+    llm: LLMSettings = Field(default_factory=LLMSettings.model_construct)
+    rag: RAGSettings = Field(default_factory=RAGSettings.model_construct)
+    pdf: PDFSettings = Field(default_factory=PDFSettings.model_construct)
+    audit: AuditSettings = Field(default_factory=AuditSettings.model_construct)
 
     # Backwards compatibility
     @property
@@ -118,6 +175,31 @@ class Settings(BaseModel):
         """Ensure output directory exists."""
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-
-# Global settings instance
-settings = Settings()
+    @classmethod
+    def load_from_file(cls, path: str | Path) -> "Settings":
+        """
+        Load settings from a JSON file, with full validation.
+
+        Args:
+            path: Path to a JSON settings file; omitted keys keep their defaults
+
+        Returns:
+            Validated Settings instance
+        """
+        return cls.model_validate_json(Path(path).read_text(encoding="utf-8"))
+
+    def reload(self):
+        """
+        Re-read environment-derived values.
+        Call after changing API key env vars at runtime (e.g. in tests).
+        """
+        self.llm.reload()
+
+
+# Global settings instance; the defaults are trusted, so skip validation
+settings = Settings.model_construct(
+    llm=LLMSettings.model_construct(),
+    rag=RAGSettings.model_construct(),
+    pdf=PDFSettings.model_construct(),
+    audit=AuditSettings.model_construct(),
+)
@@ -2,5 +2,13 @@
 EagleEye Lite - Lightweight Audit Agent for Financial PDF Documents
 """
 
+import sys
+from pathlib import Path
+
+# Make the top-level config package importable once for every submodule
+_PROJECT_ROOT = str(Path(__file__).resolve().parents[1])
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
 __version__ = "0.1.0"
 __author__ = "EagleEye Team"
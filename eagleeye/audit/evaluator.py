@@ -5,14 +5,233 @@ Logic Evaluator - Safe evaluation of rule logic schemas.
 import re
 import ast
 import operator
-from typing import Any, Optional
-from loguru import logger
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from collections import ChainMap, UserDict
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional
+
+
+# Schema rewriting tokens, matched in a single pass by _preprocess_schema
+_RE_SCHEMA_TOKENS = re.compile(
+    r"(?P<logical>\b(?:AND|OR|NOT)\b)"
+    r"|(?P<contains>(?P<field>\w+)\s*包含\s*\[(?P<items>[^\]]+)\])"
+    r"|COUNT\((?P<cond_list>[^)]+)\s*(?P<cond_op>[<>]=?|==)\s*(?P<cond_value>[^)]+)\)"
+    r"|COUNT\((?P<count_list>[^)]+)\)"
+    r"|(?P<null>==\s*(?:NULL|None)\b)"
+)
+_RE_THRESHOLD = re.compile(r'[><=!]+\s*([0-9.]+)')
+
+# Substrings that signal a schema needs rewriting before parsing
+_REWRITE_TOKENS = ("AND", "OR", "NOT", "包含", "NULL", "None", "COUNT")
+
+# Below this many schemas evaluate_many runs inline rather than in a pool
+_MIN_PARALLEL_SCHEMAS = 256
+
+# Space-delimited logical keywords and their Python spelling
+_LOGICAL_KEYWORDS = ((" AND ", " and "), (" OR ", " or "), (" NOT ", " not "))
+
+# Allowed operators for safe evaluation, read-only and baked into the
+# compiled closures so no lookup happens at evaluation time
+_SAFE_OPS = MappingProxyType({
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+    ast.Gt: operator.gt,
+    ast.Lt: operator.lt,
+    ast.GtE: operator.ge,
+    ast.LtE: operator.le,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+    ast.And: lambda a, b: a and b,
+    ast.Or: lambda a, b: a or b,
+    ast.Not: operator.not_,
+})
+
+# Allowed function calls
+_SAFE_FUNCS = MappingProxyType({
+    "abs": abs,
+    "max": max,
+    "min": min,
+    "sum": sum,
+    "len": len,
+    "any": any,
+    "all": all,
+    "COUNT": lambda x: sum(1 for item in x if item) if isinstance(x, (list, tuple)) else (1 if x else 0),
+})
+
+
+class MissingField(LookupError):
+    """Raised when a logic schema references a field with no data value."""
+
+
+class _EvidenceRecorder(UserDict):
+    """Bindings mapping that records every field value read during evaluation."""
+
+    def __init__(self, data: dict[str, Any], evidence: dict[str, Any]):
+        super().__init__()
+        self.data = data
+        self.evidence = evidence
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.data[key]
+        if value is None:
+            raise KeyError(key)
+        self.evidence[key] = value
+        return value
+
+
+class _ClosureCompiler(ast.NodeVisitor):
+    """
+    Compiles a parsed logic schema into nested closures over bindings.
+    Each visit_<NodeType> method returns a callable taking the bindings
+    mapping; node types without a visitor are rejected.
+    """
+
+    def generic_visit(self, node: ast.AST):
+        raise ValueError(f"Unsupported AST node: {type(node)}")
+
+    def visit_Expression(self, node: ast.Expression):
+        """Compile a whole schema into a predicate returning (result, calculated_value)."""
+        if isinstance(node.body, ast.Compare):
+            # Keep the calculated value of the top-level comparison
+            return self.compile_compare(node.body, capture_left=True)
+        body = self.visit(node.body)
+        return lambda b: (body(b), None)
+
+    def visit_Constant(self, node: ast.Constant):
+        value = node.value
+        return lambda b: value
+
+    def visit_List(self, node: ast.List):
+        elts = [self.visit(el) for el in node.elts]
+        return lambda b: [el(b) for el in elts]
+
+    def visit_Tuple(self, node: ast.Tuple):
+        elts = [self.visit(el) for el in node.elts]
+        return lambda b: tuple(el(b) for el in elts)
+
+    def visit_BinOp(self, node: ast.BinOp):
+        op = _SAFE_OPS.get(type(node.op))
+        if not op:
+            raise ValueError(f"Unsupported operator: {type(node.op)}")
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        if isinstance(node.op, ast.Div):
+            # Handle division by zero
+            def divide(b):
+                dividend, divisor = left(b), right(b)
+                return float('inf') if divisor == 0 else op(dividend, divisor)
+            return divide
+        return lambda b: op(left(b), right(b))
+
+    def visit_UnaryOp(self, node: ast.UnaryOp):
+        op = _SAFE_OPS.get(type(node.op))
+        if not op:
+            raise ValueError(f"Unsupported unary operator: {type(node.op)}")
+        operand = self.visit(node.operand)
+        return lambda b: op(operand(b))
+
+    def visit_Compare(self, node: ast.Compare):
+        compare = self.compile_compare(node)
+        return lambda b: compare(b)[0]
+
+    def visit_BoolOp(self, node: ast.BoolOp):
+        values = [self.visit(v) for v in node.values]
+        if isinstance(node.op, ast.And):
+            return lambda b: all(v(b) for v in values)
+        return lambda b: any(v(b) for v in values)
+
+    def visit_Call(self, node: ast.Call):
+        func_name = node.func.id if isinstance(node.func, ast.Name) else None
+        func = _SAFE_FUNCS.get(func_name)
+        if func is None:
+            raise ValueError(f"Unsupported function: {func_name}")
+        args = [self.visit(arg) for arg in node.args]
+        return lambda b: func(*[arg(b) for arg in args])
+
+    def visit_Name(self, node: ast.Name):
+        key = node.id
+
+        def lookup(b):
+            try:
+                return b[key]
+            except KeyError:
+                raise MissingField(key) from None
+        return lookup
+
+    def visit_IfExp(self, node: ast.IfExp):
+        test = self.visit(node.test)
+        body = self.visit(node.body)
+        orelse = self.visit(node.orelse)
+        return lambda b: body(b) if test(b) else orelse(b)
+
+    def visit_GeneratorExp(self, node: ast.GeneratorExp | ast.ListComp):
+        # Handle comprehensions like sum(1 for x in list if x < 0)
+        generator = node.generators[0]
+        if len(node.generators) != 1 or not isinstance(generator.target, ast.Name):
+            raise ValueError("Only single-target comprehensions are supported")
+        target = generator.target.id
+        iterable = self.visit(generator.iter)
+        conditions = [self.visit(cond) for cond in generator.ifs]
+        element = self.visit(node.elt)
+
+        def comprehension(b):
+            result = []
+            for item in iterable(b):
+                scope = ChainMap({target: item}, b)
+                if all(cond(scope) for cond in conditions):
+                    result.append(element(scope))
+            return result
+        return comprehension
+
+    visit_ListComp = visit_GeneratorExp
+
+    def compile_compare(
+        self,
+        node: ast.Compare,
+        capture_left: bool = False
+    ) -> Callable[[Mapping[str, Any]], tuple[bool, Optional[float]]]:
+        """
+        Compile a (possibly chained) comparison.
+        The closure returns (result, left_value); left_value is the numeric
+        left-hand operand when capture_left is set, otherwise None.
+        """
+        steps = []
+        for op, comparator in zip(node.ops, node.comparators):
+            op_func = _SAFE_OPS.get(type(op))
+            if not op_func:
+                raise ValueError(f"Unsupported comparison: {type(op)}")
+            steps.append((op_func, self.visit(comparator)))
+        first = self.visit(node.left)
+
+        def compare(b):
+            left = first(b)
+            captured = None
+            if capture_left and isinstance(left, (int, float)):
+                captured = float(left)
+            for op_func, comparator in steps:
+                right = comparator(b)
+                if not op_func(left, right):
+                    return False, captured
+                left = right
+            return True, captured
+        return compare
 
 
 class LogicEvaluator:
     """
     Evaluates logic_schema strings from audit rules.
-    Supports safe evaluation with financial data substitution.
+    Supports safe evaluation against financial data bindings.
 
     Supported operators:
         - Comparison: >, <, >=, <=, ==, !=
@@ -21,40 +240,9 @@ class LogicEvaluator:
         - Special: COUNT(), in, 包含
     """
 
-    # Allowed operators for safe evaluation
-    SAFE_OPERATORS = {
-        ast.Add: operator.add,
-        ast.Sub: operator.sub,
-        ast.Mult: operator.mul,
-        ast.Div: operator.truediv,
-        ast.Mod: operator.mod,
-        ast.Pow: operator.pow,
-        ast.USub: operator.neg,
-        ast.UAdd: operator.pos,
-        ast.Gt: operator.gt,
-        ast.Lt: operator.lt,
-        ast.GtE: operator.ge,
-        ast.LtE: operator.le,
-        ast.Eq: operator.eq,
-        ast.NotEq: operator.ne,
-        ast.And: lambda a, b: a and b,
-        ast.Or: lambda a, b: a or b,
-        ast.Not: operator.not_,
-    }
-
-    # Allowed function calls
-    SAFE_FUNCTIONS = {
-        "abs": abs,
-        "max": max,
-        "min": min,
-        "sum": sum,
-        "len": len,
-        "COUNT": lambda x: sum(1 for item in x if item) if isinstance(x, (list, tuple)) else (1 if x else 0),
-    }
-
-    def __init__(self):
-        """Initialize evaluator."""
-        self._evidence: dict[str, Any] = {}
+    # Allowed operators and function calls (read-only)
+    SAFE_OPERATORS = _SAFE_OPS
+    SAFE_FUNCTIONS = _SAFE_FUNCS
 
     def evaluate(
         self,
@@ -76,344 +264,218 @@ class LogicEvaluator:
                 - threshold_value: float (if applicable)
                 - error: str (if evaluation failed)
         """
-        self._evidence = {}
+        evidence: dict[str, Any] = {}
 
         try:
-            # Preprocess the schema
-            processed = self._preprocess_schema(logic_schema)
+            # Preprocess + parse + compile once per distinct schema
+            predicate, field_names = self._compile(logic_schema)
 
-            # Substitute financial data values
-            substituted = self._substitute_values(processed, financial_data)
+            # Bind financial data by reference; None values read as missing
+            bindings = _EvidenceRecorder(financial_data, evidence)
 
-            # Check if we have enough data
-            if self._has_missing_data(substituted):
+            # Safely evaluate the expression
+            try:
+                result, calculated_value = predicate(bindings)
+            except MissingField:
                 return {
                     "violation": False,
-                    "evidence": self._evidence,
+                    "evidence": evidence,
                     "error": "Insufficient data for evaluation",
-                    "missing_fields": self._get_missing_fields(processed, financial_data)
+                    "missing_fields": self._get_missing_fields(field_names, financial_data)
                 }
 
-            # Safely evaluate the expression
-            result = self._safe_eval(substituted)
-
             return {
                 "violation": bool(result),
-                "evidence": self._evidence,
-                "calculated_value": self._extract_calculated_value(substituted),
+                "evidence": evidence,
+                "calculated_value": calculated_value,
                 "threshold_value": self._extract_threshold_value(logic_schema),
                 "error": None
             }
 
         except Exception as e:
+            from loguru import logger  # Only needed on the error path
             logger.warning(f"Logic evaluation error: {e}")
             return {
                 "violation": False,
-                "evidence": self._evidence,
+                "evidence": evidence,
                 "error": str(e)
             }
 
-    def _preprocess_schema(self, schema: str) -> str:
-        """
-        Preprocess logic schema for evaluation.
-        Converts Chinese operators and normalizes syntax.
+    def evaluate_many(
+        self,
+        logic_schemas: list[str],
+        financial_data: dict[str, Any],
+        workers: int = 1
+    ) -> list[dict]:
         """
-        processed = schema
-
-        # Convert Chinese logical operators
-        processed = re.sub(r'\bAND\b', ' and ', processed)
-        processed = re.sub(r'\bOR\b', ' or ', processed)
-        processed = re.sub(r'\bNOT\b', ' not ', processed)
-
-        # Handle Chinese "包含" (contains) operator
-        processed = re.sub(
-            r"(\w+)\s*包含\s*\[([^\]]+)\]",
-            r"any(item in \1 for item in [\2])",
-            processed
-        )
+        Evaluate several logic schemas against the same financial data.
 
-        # Handle "in" lists
-        processed = re.sub(
-            r"(\w+)\s+in\s+\[([^\]]+)\]",
-            r"\1 in [\2]",
-            processed
-        )
+        Evaluation is stateless, so large batches are spread over a process
+        pool; each worker receives the financial data once and keeps its own
+        compiled-schema cache. Small batches run inline, where pool startup
+        would cost more than it saves.
 
-        # Handle == comparison with None/NULL
-        processed = processed.replace("== NULL", "is None")
-        processed = processed.replace("== None", "is None")
+        Args:
+            logic_schemas: Logic expression strings, e.g. one per rule
+            financial_data: Dict of financial field values
+            workers: Maximum worker processes (1 disables the pool)
 
-        # Handle COUNT() function with conditions
-        count_pattern = r"COUNT\(([^)]+)\s*(<|>|<=|>=|==)\s*([^)]+)\)"
-        match = re.search(count_pattern, processed)
-        if match:
-            list_name = match.group(1).strip()
-            op = match.group(2)
-            value = match.group(3).strip()
-            # Convert to list comprehension count
-            processed = re.sub(
-                count_pattern,
-                f"sum(1 for x in {list_name} if x {op} {value})",
-                processed
-            )
-
-        # Simple COUNT(list == condition)
-        processed = re.sub(
-            r"COUNT\(([^)]+)\)",
-            r"len([x for x in \1 if x])" if "==" in processed else r"len(\1)",
-            processed
-        )
+        Returns:
+            Result dicts (as returned by evaluate), in input order
+        """
+        if workers <= 1 or len(logic_schemas) < _MIN_PARALLEL_SCHEMAS:
+            return [self.evaluate(schema, financial_data) for schema in logic_schemas]
 
-        return processed
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(financial_data,)
+        ) as pool:
+            return list(pool.map(_evaluate_in_worker, logic_schemas, chunksize=32))
 
-    def _substitute_values(
+    def evaluate_batch(
         self,
-        schema: str,
-        financial_data: dict[str, Any]
-    ) -> str:
+        logic_schemas: list[str],
+        records: list[dict[str, Any]]
+    ):
         """
-        Substitute financial data values into schema.
-        """
-        result = schema
-
-        # Sort by key length (longest first) to avoid partial replacements
-        sorted_keys = sorted(financial_data.keys(), key=len, reverse=True)
-
-        for key in sorted_keys:
-            value = financial_data.get(key)
-
-            if value is not None:
-                # Record evidence
-                self._evidence[key] = value
+        Violation flags for several logic schemas across several documents.
 
-                # Handle different value types
-                if isinstance(value, bool):
-                    replacement = "True" if value else "False"
-                elif isinstance(value, str):
-                    replacement = f'"{value}"'
-                elif isinstance(value, (list, tuple)):
-                    replacement = str(value)
-                else:
-                    replacement = str(value)
+        Arithmetic/comparison schemas are evaluated with one NumPy pass per
+        schema over all documents' values; schemas the vectorized path does
+        not support (COUNT, 包含, lists, non-numeric data) fall back to
+        evaluate() per document. Only violations are returned, not evidence.
 
-                # Replace field name with value
-                # Use word boundary matching to avoid partial replacements
-                pattern = re.escape(key)
-                result = re.sub(rf'\b{pattern}\b', replacement, result)
-
-        return result
-
-    def _has_missing_data(self, substituted: str) -> bool:
-        """Check if there are unsubstituted Chinese field names."""
-        # Look for remaining Chinese characters that aren't in strings
-        chinese_pattern = r'[\u4e00-\u9fff]+'
-        matches = re.findall(chinese_pattern, substituted)
-
-        # Filter out matches that are inside quotes
-        in_string = False
-        for char in substituted:
-            if char in '"\'':
-                in_string = not in_string
+        Args:
+            logic_schemas: Logic expression strings, e.g. one per rule
+            records: Financial data dicts, one per document
 
-        return bool(matches) and not in_string
+        Returns:
+            Bool array of shape (len(logic_schemas), len(records)) where
+            [i, j] equals evaluate(logic_schemas[i], records[j])["violation"]
+        """
+        import numpy as np
+        from eagleeye.audit.vectorized import ColumnBatch, Unvectorizable, compile_vectorized
 
-    def _get_missing_fields(
-        self,
-        schema: str,
-        financial_data: dict[str, Any]
-    ) -> list[str]:
-        """Get list of fields referenced but not in data."""
-        # Extract potential field names (Chinese text)
-        chinese_pattern = r'[\u4e00-\u9fff_]+'
-        potential_fields = re.findall(chinese_pattern, schema)
+        columns = ColumnBatch(records)
+        violations = np.zeros((len(logic_schemas), len(records)), dtype=bool)
 
-        missing = []
-        for field in potential_fields:
-            if field not in financial_data or financial_data[field] is None:
-                missing.append(field)
+        for i, schema in enumerate(logic_schemas):
+            try:
+                violations[i] = compile_vectorized(self._preprocess_schema(schema))(columns)
+            except Unvectorizable:
+                violations[i] = [self.evaluate(schema, record)["violation"] for record in records]
 
-        return list(set(missing))
+        return violations
 
-    def _safe_eval(self, expression: str) -> Any:
+    @classmethod
+    @functools.lru_cache(maxsize=4096)
+    def _compile(cls, logic_schema: str) -> tuple[Callable, frozenset[str]]:
         """
-        Safely evaluate an expression using AST parsing.
+        Compile a logic schema into a predicate plus the field names it references.
+        Cached per schema string, so repeat evaluations skip regex, parsing and
+        AST dispatch. The predicate maps bindings to (result, calculated_value).
         """
-        try:
-            # Parse expression to AST
-            tree = ast.parse(expression, mode='eval')
-
-            # Evaluate AST safely
-            return self._eval_node(tree.body)
-
-        except SyntaxError as e:
-            logger.warning(f"Syntax error in expression: {expression[:100]}...")
-            # Fall back to simple evaluation for basic expressions
-            return self._simple_eval(expression)
-
-    def _eval_node(self, node: ast.AST) -> Any:
-        """Recursively evaluate AST node."""
-        if isinstance(node, ast.Constant):
-            return node.value
-
-        elif isinstance(node, ast.Num):  # Python 3.7 compatibility
-            return node.n
-
-        elif isinstance(node, ast.Str):  # Python 3.7 compatibility
-            return node.s
-
-        elif isinstance(node, ast.List):
-            return [self._eval_node(el) for el in node.elts]
-
-        elif isinstance(node, ast.Tuple):
-            return tuple(self._eval_node(el) for el in node.elts)
-
-        elif isinstance(node, ast.BinOp):
-            left = self._eval_node(node.left)
-            right = self._eval_node(node.right)
-            op = self.SAFE_OPERATORS.get(type(node.op))
-            if op:
-                # Handle division by zero
-                if isinstance(node.op, ast.Div) and right == 0:
-                    return float('inf')
-                return op(left, right)
-            raise ValueError(f"Unsupported operator: {type(node.op)}")
-
-        elif isinstance(node, ast.UnaryOp):
-            operand = self._eval_node(node.operand)
-            op = self.SAFE_OPERATORS.get(type(node.op))
-            if op:
-                return op(operand)
-            raise ValueError(f"Unsupported unary operator: {type(node.op)}")
-
-        elif isinstance(node, ast.Compare):
-            left = self._eval_node(node.left)
-            for op, comparator in zip(node.ops, node.comparators):
-                right = self._eval_node(comparator)
-                op_func = self.SAFE_OPERATORS.get(type(op))
-                if op_func:
-                    if not op_func(left, right):
-                        return False
-                    left = right
-                elif isinstance(op, ast.In):
-                    if left not in right:
-                        return False
-                    left = right
-                elif isinstance(op, ast.NotIn):
-                    if left in right:
-                        return False
-                    left = right
-                elif isinstance(op, ast.Is):
-                    if left is not right:
-                        return False
-                    left = right
-                elif isinstance(op, ast.IsNot):
-                    if left is right:
-                        return False
-                    left = right
-                else:
-                    raise ValueError(f"Unsupported comparison: {type(op)}")
-            return True
-
-        elif isinstance(node, ast.BoolOp):
-            if isinstance(node.op, ast.And):
-                return all(self._eval_node(v) for v in node.values)
-            elif isinstance(node.op, ast.Or):
-                return any(self._eval_node(v) for v in node.values)
-
-        elif isinstance(node, ast.Call):
-            func_name = node.func.id if isinstance(node.func, ast.Name) else None
-            if func_name in self.SAFE_FUNCTIONS:
-                args = [self._eval_node(arg) for arg in node.args]
-                return self.SAFE_FUNCTIONS[func_name](*args)
-            raise ValueError(f"Unsupported function: {func_name}")
-
-        elif isinstance(node, ast.Name):
-            # Handle special constants
-            if node.id == 'True':
-                return True
-            elif node.id == 'False':
-                return False
-            elif node.id == 'None':
-                return None
-            raise ValueError(f"Unknown name: {node.id}")
-
-        elif isinstance(node, ast.NameConstant):  # Python 3.7 compatibility
-            return node.value
-
-        elif isinstance(node, ast.IfExp):
-            test = self._eval_node(node.test)
-            return self._eval_node(node.body) if test else self._eval_node(node.orelse)
-
-        elif isinstance(node, ast.GeneratorExp):
-            # Handle generator expressions like sum(1 for x in list if x < 0)
-            result = []
-            iter_val = self._eval_node(node.generators[0].iter)
-            for item in iter_val:
-                # Simplified: just check if conditions pass
-                if node.generators[0].ifs:
-                    # Skip items that don't pass filter
-                    pass
-                result.append(self._eval_node(node.elt))
-            return result
-
-        raise ValueError(f"Unsupported AST node: {type(node)}")
-
-    def _simple_eval(self, expression: str) -> bool:
+        processed = cls._preprocess_schema(logic_schema)
+        tree = ast.parse(processed, mode='eval')
+
+        # Names bound by comprehensions or used as callees are not data fields
+        local_names = {
+            target.id
+            for comp in ast.walk(tree) if isinstance(comp, ast.comprehension)
+            for target in ast.walk(comp.target) if isinstance(target, ast.Name)
+        }
+        callees = {
+            id(call.func) for call in ast.walk(tree) if isinstance(call, ast.Call)
+        }
+
+        field_names = frozenset(
+            node.id for node in ast.walk(tree)
+            if isinstance(node, ast.Name) and id(node) not in callees
+        ) - local_names - {"True", "False", "None"}
+
+        return _ClosureCompiler().visit(tree), field_names
+
+    @staticmethod
+    def _preprocess_schema(schema: str) -> str:
         """
-        Simple evaluation fallback for basic expressions.
+        Preprocess logic schema for evaluation.
+        Converts Chinese operators and normalizes syntax.
         """
-        # Try to evaluate simple comparisons
-        try:
-            # Remove extra whitespace
-            expr = " ".join(expression.split())
-
-            # Handle simple comparisons
-            for op in [' >= ', ' <= ', ' > ', ' < ', ' == ', ' != ']:
-                if op in expr:
-                    parts = expr.split(op)
-                    if len(parts) == 2:
-                        left = float(parts[0].strip())
-                        right = float(parts[1].strip())
-                        if op == ' >= ':
-                            return left >= right
-                        elif op == ' <= ':
-                            return left <= right
-                        elif op == ' > ':
-                            return left > right
-                        elif op == ' < ':
-                            return left < right
-                        elif op == ' == ':
-                            return left == right
-                        elif op == ' != ':
-                            return left != right
-
-        except (ValueError, IndexError):
-            pass
-
-        # Default to no violation
-        return False
-
-    def _extract_calculated_value(self, expression: str) -> Optional[float]:
-        """Try to extract the calculated left-hand value from comparison."""
-        # Look for comparison operators
-        for op in [' > ', ' < ', ' >= ', ' <= ', ' == ']:
-            if op in expression:
-                left_side = expression.split(op)[0].strip()
-                try:
-                    # Try to evaluate the left side
-                    return float(eval(left_side))
-                except Exception:
-                    pass
-        return None
+        # Plain arithmetic/comparison schemas need no rewriting
+        if not any(token in schema for token in _REWRITE_TOKENS):
+            return schema
+
+        # Space-delimited AND/OR/NOT are plain substring swaps; the regex
+        # below still catches any keyword not written between spaces
+        padded = f" {schema} "
+        for keyword, replacement in _LOGICAL_KEYWORDS:
+            padded = padded.replace(keyword, replacement)
+        schema = padded[1:-1]
+        if not any(token in schema for token in _REWRITE_TOKENS):
+            return schema
+
+        # COUNT(list) counts truthy items when the schema compares with ==
+        count_truthy = "==" in schema.replace("== NULL", "").replace("== None", "")
+
+        def rewrite(match: re.Match) -> str:
+            kind = match.lastgroup
+            if kind == "logical":
+                # Convert Chinese logical operators
+                return f" {match.group('logical').lower()} "
+            if kind == "contains":
+                # Handle Chinese "包含" (contains) operator
+                return f"any(item in {match.group('field')} for item in [{match.group('items')}])"
+            if kind == "cond_value":
+                # Handle COUNT() function with conditions
+                # Convert to list comprehension count
+                return (
+                    f"sum(1 for x in {match.group('cond_list').strip()} "
+                    f"if x {match.group('cond_op')} {match.group('cond_value').strip()})"
+                )
+            if kind == "count_list":
+                # Simple COUNT(list == condition)
+                items = match.group('count_list')
+                return f"len([x for x in {items} if x])" if count_truthy else f"len({items})"
+            # Handle == comparison with None/NULL
+            return "is None"
+
+        return _RE_SCHEMA_TOKENS.sub(rewrite, schema)
+
+    def _get_missing_fields(
+        self,
+        field_names: frozenset[str],
+        financial_data: Mapping[str, Any]
+    ) -> list[str]:
+        """Get sorted list of fields referenced but without a data value."""
+        return sorted(
+            name for name in field_names if financial_data.get(name) is None
+        )
 
     def _extract_threshold_value(self, expression: str) -> Optional[float]:
         """Extract threshold value from original expression."""
         # Look for numeric thresholds
-        pattern = r'[><=!]+\s*([0-9.]+)'
-        match = re.search(pattern, expression)
+        match = _RE_THRESHOLD.search(expression)
         if match:
             try:
                 return float(match.group(1))
             except ValueError:
                 pass
         return None
+
+
+# Per-process state for LogicEvaluator.evaluate_many worker pools
+_worker_evaluator: Optional[LogicEvaluator] = None
+_worker_data: dict[str, Any] = {}
+
+
+def _init_worker(financial_data: dict[str, Any]):
+    """Pool initializer: share the financial data read-only with a worker."""
+    global _worker_evaluator, _worker_data
+    _worker_evaluator = LogicEvaluator()
+    _worker_data = financial_data
+
+
+def _evaluate_in_worker(logic_schema: str) -> dict:
+    """Evaluate one schema in a pool worker."""
+    return _worker_evaluator.evaluate(logic_schema, _worker_data)
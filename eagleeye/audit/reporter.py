@@ -2,17 +2,24 @@
 Audit Reporter - Generate audit reports in various formats.
 """
 
-import json
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 from loguru import logger
 
-import sys
-sys.path.insert(0, str(__file__).rsplit("\\", 3)[0])
-
 from config.settings import settings
-from eagleeye.models.finding import Finding, AuditReport, ViolationSeverity
+from ..models.finding import Finding, AuditReport, ViolationSeverity
+
+# Risk score lower bounds for each level after the first (scores are integers)
+_RISK_THRESHOLDS = (1, 20, 50)
+_RISK_LEVELS = (
+    ("低", "🟢"),
+    ("中", "🟡"),
+    ("高", "🟠"),
+    ("极高", "🔴"),
+)
 
 
 class AuditReporter:
@@ -59,12 +66,28 @@ class AuditReporter:
             execution_time_seconds=execution_time
         )
 
-        # Add each finding
-        for finding in findings:
-            report.add_finding(finding)
+        report.add_findings(findings)
 
         return report
 
+    def _default_filename(self, report: AuditReport, ext: str) -> str:
+        """
+        Build the default output filename for a report.
+
+        The timestamp comes from the report's audit time, so every format
+        saved for one report shares the same name stem.
+
+        Args:
+            report: AuditReport being saved
+            ext: File extension without the dot
+
+        Returns:
+            Filename like audit_report_<doc>_<YYYYmmdd_HHMMSS>.<ext>
+        """
+        timestamp = report.audit_timestamp.strftime("%Y%m%d_%H%M%S")
+        doc_name = Path(report.document_name).stem
+        return f"audit_report_{doc_name}_{timestamp}.{ext}"
+
     def save_markdown(
         self,
         report: AuditReport,
@@ -81,15 +104,10 @@ class AuditReporter:
             Path to saved file
         """
         if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            doc_name = Path(report.document_name).stem
-            filename = f"audit_report_{doc_name}_{timestamp}.md"
+            filename = self._default_filename(report, "md")
 
         output_path = self.output_dir / filename
-        markdown_content = report.to_markdown()
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(markdown_content)
+        output_path.write_bytes(report.to_markdown().encode("utf-8"))
 
         logger.info(f"Markdown report saved: {output_path}")
         return output_path
@@ -110,15 +128,10 @@ class AuditReporter:
             Path to saved file
         """
         if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            doc_name = Path(report.document_name).stem
-            filename = f"audit_report_{doc_name}_{timestamp}.json"
+            filename = self._default_filename(report, "json")
 
         output_path = self.output_dir / filename
-        json_content = report.to_json()
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(json_content, f, ensure_ascii=False, indent=2, default=str)
+        output_path.write_bytes(report.to_json_bytes(indent=True))
 
         logger.info(f"JSON report saved: {output_path}")
         return output_path
@@ -131,6 +144,9 @@ class AuditReporter:
         """
         Save report in both Markdown and JSON formats.
 
+        Both serializations are cached by finalize() first, then the two
+        files are written concurrently.
+
         Args:
             report: AuditReport to save
             base_filename: Base filename (without extension)
@@ -138,15 +154,17 @@ class AuditReporter:
         Returns:
             Tuple of (markdown_path, json_path)
         """
-        if base_filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            doc_name = Path(report.document_name).stem
-            base_filename = f"audit_report_{doc_name}_{timestamp}"
+        report.finalize()
 
-        md_path = self.save_markdown(report, f"{base_filename}.md")
-        json_path = self.save_json(report, f"{base_filename}.json")
+        if base_filename is None:
+            md_name = json_name = None
+        else:
+            md_name, json_name = f"{base_filename}.md", f"{base_filename}.json"
 
-        return md_path, json_path
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="report-writer") as pool:
+            md_future = pool.submit(self.save_markdown, report, md_name)
+            json_future = pool.submit(self.save_json, report, json_name)
+            return md_future.result(), json_future.result()
 
     def generate_summary(self, report: AuditReport) -> str:
         """
@@ -182,10 +200,10 @@ class AuditReporter:
                 "",
                 "主要发现:",
             ])
-            # Show top 5 critical/high findings
+            # Show the first 5 critical/high findings, in report order
             top_findings = [
                 f for f in report.findings
-                if f.severity in [ViolationSeverity.CRITICAL, ViolationSeverity.HIGH]
+                if f.severity in (ViolationSeverity.CRITICAL, ViolationSeverity.HIGH)
             ][:5]
             for finding in top_findings:
                 lines.append(f"  • [{finding.rule_id}] {finding.rule_subject}")
@@ -202,26 +220,7 @@ class AuditReporter:
         Returns:
             Executive summary markdown
         """
-        # Calculate risk score
-        risk_score = (
-            report.critical_count * 10 +
-            report.high_count * 5 +
-            report.medium_count * 2 +
-            report.low_count * 1
-        )
-
-        if risk_score == 0:
-            risk_level = "低"
-            risk_color = "🟢"
-        elif risk_score < 20:
-            risk_level = "中"
-            risk_color = "🟡"
-        elif risk_score < 50:
-            risk_level = "高"
-            risk_color = "🟠"
-        else:
-            risk_level = "极高"
-            risk_color = "🔴"
+        risk_level, risk_color = _RISK_LEVELS[bisect_right(_RISK_THRESHOLDS, report.risk_score)]
 
         lines = [
             "# 执行摘要",
@@ -240,10 +239,7 @@ class AuditReporter:
                 "### ⚠️ 紧急关注事项",
                 "",
             ])
-            critical_findings = [
-                f for f in report.findings
-                if f.severity == ViolationSeverity.CRITICAL
-            ]
+            critical_findings = report.findings_by_severity(ViolationSeverity.CRITICAL)
             for finding in critical_findings[:3]:
                 lines.append(f"- **{finding.rule_id}**: {finding.rule_subject}")
             lines.append("")
@@ -253,10 +249,7 @@ class AuditReporter:
                 "### 高风险事项",
                 "",
             ])
-            high_findings = [
-                f for f in report.findings
-                if f.severity == ViolationSeverity.HIGH
-            ]
+            high_findings = report.findings_by_severity(ViolationSeverity.HIGH)
             for finding in high_findings[:3]:
                 lines.append(f"- **{finding.rule_id}**: {finding.rule_subject}")
             lines.append("")
@@ -316,11 +309,8 @@ class AuditReporter:
             lines.append(f"| {name} | {curr} | {prev} | {emoji} {diff_str} |")
 
         # New findings
-        current_rule_ids = {f.rule_id for f in current.findings}
-        previous_rule_ids = {f.rule_id for f in previous.findings}
-
-        new_violations = current_rule_ids - previous_rule_ids
-        resolved = previous_rule_ids - current_rule_ids
+        new_violations = current.rule_ids - previous.rule_ids
+        resolved = previous.rule_ids - current.rule_ids
 
         if new_violations:
             lines.extend([
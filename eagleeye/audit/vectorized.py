@@ -0,0 +1,189 @@
+"""
+Vectorized Evaluator - Evaluate logic schemas over many documents at once.
+
+Each schema is compiled into NumPy operations over per-field columns, so a
+batch of documents is checked with one pass of array kernels instead of one
+interpreted evaluation per document. Only plain arithmetic, comparisons,
+AND/OR/NOT and abs() over numeric fields are supported; anything else
+raises Unvectorizable and is left to LogicEvaluator.evaluate.
+"""
+
+import ast
+import functools
+from typing import Any, Callable, Mapping
+
+import numpy as np
+
+# A compiled node maps a column batch to (values, missing): missing marks
+# documents where evaluation would have read a field with no data value
+_Node = Callable[["ColumnBatch"], tuple[np.ndarray, np.ndarray]]
+
+_BINARY_OPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+}
+
+_COMPARE_OPS = {
+    ast.Gt: np.greater,
+    ast.Lt: np.less,
+    ast.GtE: np.greater_equal,
+    ast.LtE: np.less_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+
+class Unvectorizable(ValueError):
+    """Raised when a schema or its data cannot be evaluated as arrays."""
+
+
+class ColumnBatch:
+    """Financial data of several documents, exposed as one float column per field."""
+
+    def __init__(self, records: list[Mapping[str, Any]]):
+        self.records = records
+        self.size = len(records)
+        self._columns: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    def column(self, field: str) -> tuple[np.ndarray, np.ndarray]:
+        """(values, missing) for a field; None or absent values are missing."""
+        column = self._columns.get(field)
+        if column is None:
+            raw = [record.get(field) for record in self.records]
+            missing = np.fromiter((value is None for value in raw), dtype=bool, count=self.size)
+            if not all(value is None or isinstance(value, (int, float)) for value in raw):
+                raise Unvectorizable(f"Non-numeric values for {field}")
+            values = np.array([0.0 if value is None else value for value in raw], dtype=np.float64)
+            column = self._columns[field] = (values, missing)
+        return column
+
+
+class _VectorCompiler(ast.NodeVisitor):
+    """
+    Compiles a parsed schema into closures over a ColumnBatch, mirroring
+    _ClosureCompiler: AND/OR and chained comparisons short-circuit per
+    document, so a missing field only counts where it would have been read.
+    """
+
+    def generic_visit(self, node: ast.AST):
+        raise Unvectorizable(f"Unsupported AST node: {type(node).__name__}")
+
+    def visit_Expression(self, node: ast.Expression) -> _Node:
+        return self.visit(node.body)
+
+    def visit_Constant(self, node: ast.Constant) -> _Node:
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise Unvectorizable(f"Unsupported constant: {node.value!r}")
+        value = np.float64(node.value)
+        return lambda c: (value, np.False_)
+
+    def visit_Name(self, node: ast.Name) -> _Node:
+        key = node.id
+        return lambda c: c.column(key)
+
+    def visit_BinOp(self, node: ast.BinOp) -> _Node:
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        if isinstance(node.op, ast.Div):
+            def divide(c):
+                (dividend, left_missing), (divisor, right_missing) = left(c), right(c)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    quotient = np.where(divisor == 0, np.inf, dividend / np.where(divisor == 0, 1.0, divisor))
+                return quotient, left_missing | right_missing
+            return divide
+
+        op = _BINARY_OPS.get(type(node.op))
+        if op is None:
+            raise Unvectorizable(f"Unsupported operator: {type(node.op).__name__}")
+
+        def binary(c):
+            (left_value, left_missing), (right_value, right_missing) = left(c), right(c)
+            with np.errstate(over="ignore", invalid="ignore"):
+                return op(left_value, right_value), left_missing | right_missing
+        return binary
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> _Node:
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.USub):
+            return lambda c: _apply(np.negative, operand(c))
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        if isinstance(node.op, ast.Not):
+            return lambda c: _apply(np.logical_not, operand(c))
+        raise Unvectorizable(f"Unsupported unary operator: {type(node.op).__name__}")
+
+    def visit_Call(self, node: ast.Call) -> _Node:
+        if not (isinstance(node.func, ast.Name) and node.func.id == "abs" and len(node.args) == 1):
+            raise Unvectorizable("Only abs(x) calls are supported")
+        operand = self.visit(node.args[0])
+        return lambda c: _apply(np.abs, operand(c))
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> _Node:
+        values = [self.visit(value) for value in node.values]
+        is_and = isinstance(node.op, ast.And)
+
+        def boolean(c):
+            # Documents still waiting for an operand to decide the result
+            undecided = np.True_
+            result = np.False_
+            missing = np.False_
+            for value in values:
+                truth, value_missing = value(c)
+                truth = truth != 0
+                missing = missing | (undecided & value_missing)
+                read = undecided & ~value_missing
+                if is_and:
+                    undecided = read & truth
+                else:
+                    result = result | (read & truth)
+                    undecided = read & ~truth
+            return (undecided if is_and else result), missing
+        return boolean
+
+    def visit_Compare(self, node: ast.Compare) -> _Node:
+        first = self.visit(node.left)
+        steps = []
+        for op, comparator in zip(node.ops, node.comparators):
+            op_func = _COMPARE_OPS.get(type(op))
+            if op_func is None:
+                raise Unvectorizable(f"Unsupported comparison: {type(op).__name__}")
+            steps.append((op_func, self.visit(comparator)))
+
+        def compare(c):
+            left, missing = first(c)
+            undecided = ~missing
+            for op_func, comparator in steps:
+                right, right_missing = comparator(c)
+                missing = missing | (undecided & right_missing)
+                undecided = undecided & ~right_missing & op_func(left, right)
+                left = right
+            return undecided, missing
+        return compare
+
+
+def _apply(func: Callable, operand: tuple[np.ndarray, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """Apply an elementwise function to a node's values, keeping its missing mask."""
+    values, missing = operand
+    return func(values), missing
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_vectorized(processed_schema: str) -> Callable[[ColumnBatch], np.ndarray]:
+    """
+    Compile a preprocessed schema into a function returning per-document
+    violation flags. Cached per schema string.
+
+    Raises:
+        Unvectorizable: If the schema uses unsupported constructs
+    """
+    try:
+        tree = ast.parse(processed_schema, mode="eval")
+    except SyntaxError as e:
+        raise Unvectorizable(str(e)) from None
+    node = _VectorCompiler().visit(tree)
+
+    def violations(columns: ColumnBatch) -> np.ndarray:
+        values, missing = node(columns)
+        return np.broadcast_to((values != 0) & ~missing, (columns.size,))
+    return violations
@@ -1,5 +1,5 @@
 """Gateway module for AI model interactions."""
 
-from .ollama_client import LLMClient, OllamaClient, get_llm_client, get_ollama_client
+from .ollama_client import LLMClient, OllamaClient, get_llm_client, get_ollama_client, consume_json_stream
 
-__all__ = ["LLMClient", "OllamaClient", "get_llm_client", "get_ollama_client"]
+__all__ = ["LLMClient", "OllamaClient", "get_llm_client", "get_ollama_client", "consume_json_stream"]
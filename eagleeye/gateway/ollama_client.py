@@ -2,14 +2,39 @@
 LLM Client - OpenAI-compatible wrapper for DeepSeek, Ollama, OpenAI, etc.
 """
 
-from typing import Optional, Generator
-from openai import OpenAI
+import asyncio
+import functools
+import hashlib
+import importlib.util
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Generator, Iterator
+import httpx
+import numpy as np
+from openai import OpenAI, AsyncOpenAI
 from loguru import logger
 
-import sys
-sys.path.insert(0, str(__file__).rsplit("\\", 3)[0])
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads  # orjson not installed, fall back to stdlib json
+
 from config.settings import settings
 
+# HTTP/2 multiplexing needs the optional h2 package (httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Ask OpenAI-compatible providers for a bare JSON object
+_JSON_RESPONSE = {"type": "json_object"}
+
+# Bump when _rule_prompt or verdict parsing changes, so cached replies are not reused
+_RULE_CACHE_VERSION = 1
+
 
 class LLMClient:
     """
@@ -24,6 +49,10 @@ class LLMClient:
 
     _instance: Optional["LLMClient"] = None
     _client: Optional[OpenAI] = None
+    _async_client: Optional[AsyncOpenAI] = None
+    _http_client: Optional[httpx.Client] = None
+    _async_http_client: Optional[httpx.AsyncClient] = None
+    _async_loop: Optional[weakref.ref] = None
 
     def __new__(cls) -> "LLMClient":
         """Singleton pattern for memory efficiency."""
@@ -33,6 +62,10 @@ class LLMClient:
 
     def __init__(self):
         """Initialize client configuration (lazy load actual client)."""
+        # __new__ returns the shared instance; configure it only once
+        if getattr(self, "_initialized", False):
+            return
+
         self._provider = settings.llm.provider
         self._base_url = settings.llm.get_base_url()
         self._api_key = settings.llm.get_api_key()
@@ -41,26 +74,71 @@ class LLMClient:
         self._timeout = settings.llm.timeout
         self._max_tokens = settings.llm.max_tokens
         self._temperature = settings.llm.temperature
+        self._initialized = True
+
+    @classmethod
+    def reset(cls):
+        """Drop the shared instance so the next LLMClient() re-reads settings."""
+        cls._instance = None
+        get_llm_client.cache_clear()
 
     @property
     def client(self) -> OpenAI:
         """Lazy initialization of OpenAI client."""
         if self._client is None:
             logger.info(f"Initializing LLM client: provider={self._provider}, base_url={self._base_url}")
+            kwargs = self._client_kwargs()
+            self._http_client = httpx.Client(**self._http_kwargs())
+            self._client = OpenAI(http_client=self._http_client, **kwargs)
+        return self._client
 
-            # Validate API key for non-Ollama providers
-            if self._provider != "ollama" and not self._api_key:
-                raise ValueError(
-                    f"API key required for {self._provider}. "
-                    f"Set DEEPSEEK_API_KEY or OPENAI_API_KEY environment variable."
-                )
-
-            self._client = OpenAI(
-                base_url=self._base_url,
-                api_key=self._api_key or "ollama",  # Ollama doesn't need real key
-                timeout=self._timeout
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """
+        Lazy initialization of AsyncOpenAI client for concurrent requests.
+
+        Async connections belong to the event loop that opened them, so the
+        client is rebuilt whenever it is used from a different loop (e.g. each
+        asyncio.run in audit_node) instead of reusing a closed loop's pool.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is None or self._async_loop() is not loop:
+            logger.info(f"Initializing async LLM client: provider={self._provider}, base_url={self._base_url}")
+            kwargs = self._client_kwargs()
+            self._async_http_client = httpx.AsyncClient(**self._http_kwargs())
+            self._async_client = AsyncOpenAI(http_client=self._async_http_client, **kwargs)
+            self._async_loop = weakref.ref(loop)
+        return self._async_client
+
+    async def aclose(self):
+        """Close the async transport; call before the owning event loop exits."""
+        client, self._async_client, self._async_http_client = self._async_client, None, None
+        self._async_loop = None
+        if client is not None:
+            await client.close()
+
+    def _http_kwargs(self) -> dict:
+        """Pooled keep-alive transport settings, with HTTP/2 when h2 is installed."""
+        return {
+            "http2": _HTTP2_AVAILABLE,
+            "limits": httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            "timeout": self._timeout
+        }
+
+    def _client_kwargs(self) -> dict:
+        """Validate credentials and build OpenAI client constructor arguments."""
+        # Validate API key for non-Ollama providers
+        if self._provider != "ollama" and not self._api_key:
+            raise ValueError(
+                f"API key required for {self._provider}. "
+                f"Set DEEPSEEK_API_KEY or OPENAI_API_KEY environment variable."
             )
-        return self._client
+
+        return {
+            "base_url": self._base_url,
+            "api_key": self._api_key or "ollama",  # Ollama doesn't need real key
+            "timeout": self._timeout
+        }
 
     def chat_completion(
         self,
@@ -68,7 +146,8 @@ class LLMClient:
         model: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
-        stream: bool = False
+        stream: bool = False,
+        response_format: Optional[dict] = None
     ) -> str | Generator[str, None, None]:
         """
         Send chat completion request.
@@ -79,6 +158,7 @@ class LLMClient:
             temperature: Override default temperature
             max_tokens: Override default max tokens
             stream: Whether to stream the response
+            response_format: Optional response format, e.g. {"type": "json_object"}
 
         Returns:
             Complete response text or generator for streaming
@@ -90,12 +170,14 @@ class LLMClient:
         logger.debug(f"Chat completion: model={model}, messages={len(messages)}")
 
         try:
+            extra = {"response_format": response_format} if response_format else {}
             response = self.client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                stream=stream
+                stream=stream,
+                **extra
             )
 
             if stream:
@@ -107,17 +189,63 @@ class LLMClient:
             logger.error(f"Chat completion error: {e}")
             raise
 
+    async def achat_completion(
+        self,
+        messages: list[dict],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[dict] = None
+    ) -> str:
+        """
+        Send chat completion request without blocking the event loop.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            model: Override default model
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+            response_format: Optional response format, e.g. {"type": "json_object"}
+
+        Returns:
+            Complete response text
+        """
+        model = model or self._model
+        temperature = temperature if temperature is not None else self._temperature
+        max_tokens = max_tokens or self._max_tokens
+
+        logger.debug(f"Async chat completion: model={model}, messages={len(messages)}")
+
+        try:
+            extra = {"response_format": response_format} if response_format else {}
+            response = await self.async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **extra
+            )
+            return response.choices[0].message.content or ""
+
+        except Exception as e:
+            logger.error(f"Async chat completion error: {e}")
+            raise
+
     def _stream_response(self, response) -> Generator[str, None, None]:
-        """Stream response chunks."""
-        for chunk in response:
-            if chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+        """Stream response chunks; closing the generator closes the HTTP response."""
+        try:
+            for chunk in response:
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            response.close()
 
     def embedding(
         self,
         text: str | list[str],
-        model: Optional[str] = None
-    ) -> list[list[float]]:
+        model: Optional[str] = None,
+        return_numpy: bool = False
+    ) -> list[list[float]] | np.ndarray:
         """
         Generate embeddings.
 
@@ -128,13 +256,14 @@ class LLMClient:
         Args:
             text: Single text or list of texts to embed
             model: Override default embedding model
+            return_numpy: Return a (n_texts, dim) array instead of lists
 
         Returns:
-            List of embedding vectors
+            List of embedding vectors, or 2-D array if return_numpy
         """
         # For DeepSeek/OpenAI without embedding support, use local model
         if self._provider in ["deepseek"]:
-            return self._local_embedding(text)
+            return self._local_embedding(text, return_numpy=return_numpy)
 
         # For Ollama or providers with embedding API
         model = model or self._embedding_model
@@ -149,24 +278,43 @@ class LLMClient:
                 model=model,
                 input=text
             )
-            return [item.embedding for item in response.data]
+            vectors = [item.embedding for item in response.data]
+            return np.asarray(vectors, dtype=np.float32) if return_numpy else vectors
 
         except Exception as e:
             logger.warning(f"API embedding failed, using local model: {e}")
-            return self._local_embedding(text)
-
-    def _local_embedding(self, text: str | list[str]) -> list[list[float]]:
-        """Generate embeddings using local sentence-transformers model."""
-        from sentence_transformers import SentenceTransformer
+            return self._local_embedding(text, return_numpy=return_numpy)
 
+    def _local_embedding(
+        self,
+        text: str | list[str],
+        return_numpy: bool = False
+    ) -> list[list[float]] | np.ndarray:
+        """Generate embeddings using local sentence-transformers model (cached per text)."""
         if isinstance(text, str):
             text = [text]
 
-        # Use the same model as RAG indexer
-        model = SentenceTransformer(settings.rag.embedding_model)
-        embeddings = model.encode(text, convert_to_numpy=True)
-
-        return embeddings.tolist()
+        # Only encode texts not embedded before, in one batch; rows stay numpy
+        with _embedding_cache_lock:
+            found = {t: _embedding_cache[t] for t in text if t in _embedding_cache}
+        missing = list(dict.fromkeys(t for t in text if t not in found))
+        if missing:
+            # Encode outside the lock; other threads keep reading the cache
+            embeddings = _get_st_model().encode(missing, batch_size=32, convert_to_numpy=True)
+            found.update(zip(missing, embeddings))
+
+        with _embedding_cache_lock:
+            for item in text:
+                _embedding_cache[item] = found[item]
+                _embedding_cache.move_to_end(item)
+            while len(_embedding_cache) > _EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+        rows = [found[item] for item in text]
+
+        if return_numpy:
+            return np.stack(rows)
+        # Convert to Python floats only at the list (JSON/API) boundary
+        return [row.tolist() for row in rows]
 
     def health_check(self) -> bool:
         """Check if LLM service is available."""
@@ -184,17 +332,20 @@ class LLMClient:
     def analyze_financial_text(
         self,
         text: str,
-        extraction_prompt: str
-    ) -> str:
+        extraction_prompt: str,
+        stream: bool = False
+    ) -> str | Generator[str, None, None]:
         """
         Analyze financial text with structured extraction prompt.
 
         Args:
             text: Financial document text
             extraction_prompt: Prompt for structured extraction
+            stream: Return a chunk generator instead of waiting for the
+                full response (see consume_json_stream)
 
         Returns:
-            Extracted/analyzed content
+            Extracted/analyzed content, or generator of content chunks
         """
         system_prompt = """你是一个专业的财务分析助手，专门处理中国城投公司财务报表分析。
 请严格按照要求的格式输出，不要添加额外解释。"""
@@ -204,7 +355,7 @@ class LLMClient:
             {"role": "user", "content": f"{extraction_prompt}\n\n文档内容:\n{text[:8000]}"}
         ]
 
-        return self.chat_completion(messages, temperature=0.0)
+        return self.chat_completion(messages, temperature=0.0, stream=stream)
 
     def evaluate_rule(
         self,
@@ -223,7 +374,67 @@ class LLMClient:
         Returns:
             Evaluation result dict
         """
-        prompt = f"""请根据以下审计规则和财务数据，判断是否存在违规情况。
+        prompt = self._rule_prompt(rule_description, financial_context, evidence)
+        cache_file = self._rule_cache_file(prompt)
+        verdict = self._parse_verdict(_read_cached_response(cache_file))
+        if verdict is not None:
+            return verdict
+
+        response = self.chat_completion(
+            [{"role": "user", "content": prompt}],
+            temperature=0.0,
+            response_format=_JSON_RESPONSE
+        )
+        return self._verdict_and_cache(cache_file, response)
+
+    async def aevaluate_rule(
+        self,
+        rule_description: str,
+        financial_context: str,
+        evidence: dict
+    ) -> dict:
+        """
+        Async variant of evaluate_rule, for evaluating many rules concurrently.
+
+        Args:
+            rule_description: Rule description in Chinese
+            financial_context: Relevant financial data context
+            evidence: Extracted evidence dict
+
+        Returns:
+            Evaluation result dict
+        """
+        prompt = self._rule_prompt(rule_description, financial_context, evidence)
+        cache_file = self._rule_cache_file(prompt)
+        verdict = self._parse_verdict(_read_cached_response(cache_file))
+        if verdict is not None:
+            return verdict
+
+        response = await self.achat_completion(
+            [{"role": "user", "content": prompt}],
+            temperature=0.0,
+            response_format=_JSON_RESPONSE
+        )
+        return self._verdict_and_cache(cache_file, response)
+
+    def _rule_cache_file(self, prompt: str) -> Optional[Path]:
+        """
+        Cache file for a rule evaluation: keyed on the endpoint, model,
+        max_tokens and prompt (which carries the financial context and
+        evidence), plus _RULE_CACHE_VERSION. None when caching is disabled.
+        """
+        cache_dir = settings.llm.rule_cache_dir
+        if cache_dir is None:
+            return None
+        key = hashlib.sha256("\0".join((
+            f"v{_RULE_CACHE_VERSION}", self._base_url, self._model, str(self._max_tokens), prompt
+        )).encode("utf-8"))
+        return Path(cache_dir) / f"{key.hexdigest()}.txt"
+
+    @staticmethod
+    def _rule_prompt(rule_description: str, financial_context: str, evidence: dict) -> str:
+        """Build the rule evaluation prompt."""
+        return f"""请根据以下审计规则和财务数据，判断是否存在违规情况。
 
 审计规则:
 {rule_description}
@@ -242,28 +453,177 @@ class LLMClient:
 以JSON格式输出:
 {{"violation": true/false, "reason": "...", "risk_level": "..."}}"""
 
-        response = self.chat_completion(
-            [{"role": "user", "content": prompt}],
-            temperature=0.0
-        )
+    def _verdict_and_cache(self, cache_file: Optional[Path], response: str) -> dict:
+        """Parse a fresh response, caching it only if it holds a usable verdict."""
+        if self._parse_verdict(response) is not None:
+            _store_cached_response(cache_file, response)
+        return self._parse_rule_response(response)
+
+    @classmethod
+    def _parse_verdict(cls, response: Optional[str]) -> Optional[dict]:
+        """The response's verdict if it is a JSON object with a violation key, else None."""
+        if not response:
+            return None
+        verdict = cls._extract_json_object(response)
+        if verdict is None or "violation" not in verdict:
+            return None
+        return verdict
+
+    @classmethod
+    def _parse_rule_response(cls, response: str) -> dict:
+        """Parse the JSON verdict out of a rule evaluation response."""
+        verdict = cls._extract_json_object(response)
+        if verdict is not None:
+            return verdict
+        return {"violation": False, "reason": response, "risk_level": "未知"}
 
-        # Parse JSON response
-        import json
+    @staticmethod
+    def _extract_json_object(response: str) -> Optional[dict]:
+        """The JSON object in a response (bare or inside prose), or None."""
+        # JSON mode responses are a bare object; parse them directly
         try:
-            json_start = response.find("{")
-            json_end = response.rfind("}") + 1
-            if json_start >= 0 and json_end > json_start:
-                return json.loads(response[json_start:json_end])
-        except json.JSONDecodeError:
+            verdict = _json_loads(response)
+            if isinstance(verdict, dict):
+                return verdict
+        except ValueError:
             pass
 
-        return {"violation": False, "reason": response, "risk_level": "未知"}
+        # Otherwise locate the object inside surrounding prose
+        json_start = response.find("{")
+        json_end = response.rfind("}") + 1
+        if json_start >= 0 and json_end > json_start:
+            try:
+                verdict = _json_loads(response[json_start:json_end])
+                if isinstance(verdict, dict):
+                    return verdict
+            except ValueError:
+                pass
+
+        return None
+
+
+def _read_cached_response(cache_file: Optional[Path]) -> Optional[str]:
+    """Cached raw LLM response, or None if caching is off or nothing is stored."""
+    if cache_file is None:
+        return None
+    try:
+        return cache_file.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Ignoring unreadable LLM cache entry {cache_file.name}: {e}")
+        return None
+
+
+def _store_cached_response(cache_file: Optional[Path], response: str):
+    """Write a raw LLM response to the cache atomically; empty responses are not kept."""
+    if cache_file is None or not response:
+        return
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(response, encoding="utf-8")
+        os.replace(tmp_file, cache_file)
+        _evict_cached_responses(cache_file.parent, settings.llm.rule_cache_max_entries)
+    except OSError as e:
+        logger.warning(f"Could not write LLM cache: {e}")
+
+
+def _evict_cached_responses(cache_dir: Path, max_entries: int):
+    """Delete the least recently written cache entries beyond max_entries."""
+    entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith(".txt")]
+    if len(entries) <= max_entries:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    for entry in entries[:len(entries) - max_entries]:
+        try:
+            os.unlink(entry.path)
+        except FileNotFoundError:
+            pass  # removed concurrently
 
 
 # Backwards compatibility aliases
 OllamaClient = LLMClient
 
+# Local embeddings by text, least recently used first
+_EMBEDDING_CACHE_SIZE = 4096
+_embedding_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+_embedding_cache_lock = threading.Lock()
 
+
+@functools.lru_cache(maxsize=1)
+def _get_st_model():
+    """Load the local sentence-transformers model once per process."""
+    from sentence_transformers import SentenceTransformer
+
+    # Use the same model as RAG indexer
+    model = SentenceTransformer(settings.rag.embedding_model)
+
+    dtype = settings.rag.embedding_dtype
+    if dtype == "float16":
+        import torch
+        if torch.cuda.is_available():
+            model = model.half()
+        else:
+            logger.warning("float16 embeddings need a CUDA device, keeping float32")
+    elif dtype == "int8":
+        import torch
+        # Dynamic int8 quantization of the Linear layers (CPU inference)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    return model
+
+
+def consume_json_stream(chunks: Iterator[str]) -> str:
+    """
+    Read streamed text until the first complete top-level JSON object.
+
+    Stops as soon as the object's closing brace arrives and closes the
+    stream, which releases the underlying HTTP connection early.
+
+    Args:
+        chunks: Streamed text chunks, e.g. from chat_completion(stream=True)
+
+    Returns:
+        Text of the first complete {...} object, or all text if none completes
+    """
+    parts = []
+    offset = 0
+    depth = 0
+    start = None
+    in_string = escaped = False
+
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            for i, char in enumerate(chunk):
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif char == "\\":
+                        escaped = True
+                    elif char == '"':
+                        in_string = False
+                elif char == '"' and depth:
+                    in_string = True
+                elif char == "{":
+                    if depth == 0:
+                        start = offset + i
+                    depth += 1
+                elif char == "}" and depth:
+                    depth -= 1
+                    if depth == 0:
+                        return "".join(parts)[start:offset + i + 1]
+            offset += len(chunk)
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+    return "".join(parts)
+
+
+@functools.lru_cache(maxsize=1)
 def get_llm_client() -> LLMClient:
     """Get singleton LLM client instance."""
     return LLMClient()
@@ -272,4 +632,4 @@ def get_llm_client() -> LLMClient:
 # Backwards compatibility
 def get_ollama_client() -> LLMClient:
     """Get singleton LLM client instance (backwards compatible)."""
-    return LLMClient()
+    return get_llm_client()
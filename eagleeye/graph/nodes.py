@@ -3,19 +3,45 @@ Audit Nodes - LangGraph node functions for the audit workflow.
 """
 
 import time
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Optional
 from loguru import logger
 
-import sys
-sys.path.insert(0, str(__file__).rsplit("\\", 3)[0])
-
+from config.settings import settings
 from eagleeye.graph.state import AuditState
 from eagleeye.tools.pdf_parser import PDFParser
 from eagleeye.rag.retriever import RuleRetriever
 from eagleeye.audit.evaluator import LogicEvaluator
 from eagleeye.audit.reporter import AuditReporter
+from eagleeye.gateway.ollama_client import get_llm_client
 from eagleeye.models.finding import Finding, AuditReport, ViolationSeverity
 from eagleeye.models.rule import Rule
 
+# Map rule priority to finding severity
+_SEVERITY_MAP: dict[str, ViolationSeverity] = {
+    "Critical": ViolationSeverity.CRITICAL,
+    "High": ViolationSeverity.HIGH,
+    "Medium": ViolationSeverity.MEDIUM,
+    "Low": ViolationSeverity.LOW
+}
+
+# Background retrieval warm-ups by run ID. Futures cannot live in graph
+# state (it must stay serializable), so the runner registers them here.
+_warm_ups: dict[str, Future] = {}
+
+
+def register_warm_up(run_id: str, future: Optional[Future]):
+    """Register (or, with None, remove) the retrieval warm-up of a run."""
+    if future is None:
+        _warm_ups.pop(run_id, None)
+    else:
+        _warm_ups[run_id] = future
+
+
+# LLM verdict strings that mean "violation"; anything else is not one
+_TRUTHY_VERDICTS = frozenset({"true", "yes", "y", "1", "是", "违规", "存在违规"})
+
 
 def parse_node(state: AuditState) -> dict:
     """
@@ -30,7 +56,7 @@ def parse_node(state: AuditState) -> dict:
     logger.info(f"[PARSE] Starting PDF parsing: {state['pdf_path']}")
 
     try:
-        parser = PDFParser()
+        parser = PDFParser(page_batch_size=state.get("pdf_batch_size"))
         document = parser.parse(state["pdf_path"])
 
         logger.info(f"[PARSE] Parsed {document.total_pages} pages using {document.parse_method}")
@@ -41,8 +67,6 @@ def parse_node(state: AuditState) -> dict:
 
         return {
             "document": document,
-            "raw_text": document.raw_text,
-            "financial_data": document.financial_data,
             "extracted_keywords": keywords,
             "parse_error": None
         }
@@ -51,7 +75,6 @@ def parse_node(state: AuditState) -> dict:
         logger.error(f"[PARSE] Error: {e}")
         return {
             "parse_error": str(e),
-            "should_continue": False,
             "error_message": f"PDF parsing failed: {e}"
         }
 
@@ -68,6 +91,14 @@ def retrieve_node(state: AuditState) -> dict:
     """
     logger.info("[RETRIEVE] Starting rule retrieval")
 
+    warm_up = _warm_ups.get(state.get("run_id"))
+    if warm_up is not None:
+        # Let the background load finish rather than loading the rulebook twice
+        try:
+            warm_up.result()
+        except Exception as e:
+            logger.warning(f"[RETRIEVE] Warm-up failed, loading rules directly: {e}")
+
     try:
         retriever = RuleRetriever()
         retriever.load_rules_to_cache()
@@ -79,16 +110,15 @@ def retrieve_node(state: AuditState) -> dict:
 
             return {
                 "all_rules": all_rules,
-                "retrieved_rules": all_rules,
-                "current_rule_index": 0
+                "retrieved_rules": all_rules
             }
         else:
             # Use RAG retrieval based on document content
-            raw_text = state.get("raw_text", "")
+            document = state.get("document")
             keywords = state.get("extracted_keywords", [])
 
             retrieved = retriever.retrieve_for_document(
-                document_text=raw_text,
+                document_text=document.raw_text if document else "",
                 extracted_keywords=keywords,
                 top_k=20  # Get top 20 relevant rules
             )
@@ -96,24 +126,20 @@ def retrieve_node(state: AuditState) -> dict:
             rules = [rule for rule, score in retrieved]
             logger.info(f"[RETRIEVE] Retrieved {len(rules)} relevant rules")
 
-            return {
-                "retrieved_rules": rules,
-                "all_rules": retriever.retrieve_all_rules(),
-                "current_rule_index": 0
-            }
+            return {"retrieved_rules": rules}
 
     except Exception as e:
         logger.error(f"[RETRIEVE] Error: {e}")
         return {
-            "error_message": f"Rule retrieval failed: {e}",
-            "should_continue": False
+            "error_message": f"Rule retrieval failed: {e}"
         }
 
 
 def audit_node(state: AuditState) -> dict:
     """
-    Evaluate current rule against financial data.
-    Processes one rule at a time for memory efficiency.
+    Evaluate all retrieved rules against financial data in one pass.
+    Rule schemas are evaluated deterministically; when LLM fallback is
+    enabled, rules lacking data are sent to the LLM concurrently.
 
     Args:
         state: Current workflow state
@@ -122,80 +148,152 @@ def audit_node(state: AuditState) -> dict:
         State updates with evaluation results
     """
     rules = state.get("retrieved_rules", [])
-    current_index = state.get("current_rule_index", 0)
+    document = state.get("document")
+    financial_data = document.financial_data if document else None
+
+    if financial_data is None:
+        logger.warning(f"[AUDIT] No financial data available, skipping {len(rules)} rules")
+        return {"rules_checked": len(rules)}
+
+    logger.info(f"[AUDIT] Evaluating {len(rules)} rules")
+
+    # Convert financial data to evaluation dict
+    eval_dict = financial_data.to_eval_dict()
+
+    # Evaluate all rule schemas in one batch
+    evaluator = LogicEvaluator()
+    results = evaluator.evaluate_many(
+        [rule.logic_schema for rule in rules],
+        eval_dict,
+        workers=settings.audit.workers
+    )
+
+    if settings.audit.llm_fallback:
+        pending = [i for i, result in enumerate(results) if result.get("missing_fields")]
+        if pending:
+            logger.info(f"[AUDIT] Asking LLM about {len(pending)} rules with missing data")
+            try:
+                llm_results = _run_coroutine(lambda: _evaluate_with_llm(
+                    [rules[i] for i in pending], [results[i] for i in pending], eval_dict
+                ))
+            except Exception as e:
+                # Keep the deterministic results rather than failing the audit
+                logger.error(f"[AUDIT] LLM fallback failed, keeping schema results: {e}")
+                llm_results = []
+            for i, llm_result in zip(pending, llm_results):
+                if llm_result is not None:
+                    results[i] = llm_result
+
+    findings = []
+    for rule, result in zip(rules, results):
+        if not result["violation"]:
+            logger.debug(f"[AUDIT] No violation for {rule.rule_id}")
+            continue
+
+        logger.warning(f"[AUDIT] Violation detected: {rule.rule_id}")
+        # Fields come from validated Rule objects and evaluator output; skip revalidation
+        findings.append(Finding.model_construct(
+            rule_id=rule.rule_id,
+            rule_subject=rule.subject,
+            category=rule.category,
+            severity=_SEVERITY_MAP.get(rule.priority, ViolationSeverity.MEDIUM),
+            logic_schema=rule.logic_schema,
+            evaluation_result=True,
+            evidence=result.get("evidence", {}),
+            calculated_value=result.get("calculated_value"),
+            threshold_value=result.get("threshold_value"),
+            description=rule.description,
+            audit_procedures=rule.audit_procedures
+        ))
+
+    logger.info(f"[AUDIT] All rules checked: {len(findings)} violations")
+
+    return {
+        "rules_checked": len(rules),
+        "rules_with_violations": len(findings),
+        "findings": findings
+    }
+
+
+async def _evaluate_with_llm(
+    rules: list[Rule],
+    results: list[dict],
+    eval_dict: dict
+) -> list[Optional[dict]]:
+    """
+    Evaluate rules with the LLM concurrently, bounded by llm_concurrency.
 
-    if current_index >= len(rules):
-        logger.info("[AUDIT] All rules checked")
-        return {"should_continue": False}
+    Args:
+        rules: Rules whose schemas could not be evaluated
+        results: Deterministic results for those rules (with evidence)
+        eval_dict: Financial data evaluation dict
 
-    rule = rules[current_index]
-    logger.info(f"[AUDIT] Evaluating rule {current_index + 1}/{len(rules)}: {rule.rule_id} - {rule.subject}")
+    Returns:
+        Evaluation result per rule, or None where the LLM call failed
+    """
+    client = get_llm_client()
+    semaphore = asyncio.Semaphore(settings.audit.llm_concurrency)
+    financial_context = "\n".join(
+        f"{key}: {value}" for key, value in eval_dict.items() if value is not None
+    )
+
+    async def evaluate_one(rule: Rule, result: dict) -> dict:
+        async with semaphore:
+            verdict = await client.aevaluate_rule(rule.description, financial_context, result["evidence"])
+        return {
+            "violation": _is_violation(verdict.get("violation")),
+            "evidence": result["evidence"],
+            "calculated_value": None,
+            "threshold_value": None,
+            "error": None
+        }
 
     try:
-        evaluator = LogicEvaluator()
-        financial_data = state.get("financial_data")
-
-        if financial_data is None:
-            logger.warning(f"[AUDIT] No financial data available for {rule.rule_id}")
-            return {
-                "current_rule_index": current_index + 1,
-                "rules_checked": state.get("rules_checked", 0) + 1
-            }
-
-        # Convert financial data to evaluation dict
-        eval_dict = financial_data.to_eval_dict()
+        outcomes = await asyncio.gather(
+            *(evaluate_one(rule, result) for rule, result in zip(rules, results)),
+            return_exceptions=True
+        )
+    finally:
+        # The async transport is bound to this run's event loop
+        await client.aclose()
+
+    llm_results = []
+    for rule, outcome in zip(rules, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(
+                f"[AUDIT] LLM evaluation failed for {rule.rule_id}, "
+                f"keeping schema result: {type(outcome).__name__}: {outcome}"
+            )
+            llm_results.append(None)
+        else:
+            llm_results.append(outcome)
+    return llm_results
 
-        # Evaluate the rule
-        result = evaluator.evaluate(rule.logic_schema, eval_dict)
 
-        findings = []
-        rules_with_violations = state.get("rules_with_violations", 0)
+def _is_violation(value: Any) -> bool:
+    """Read an LLM verdict's violation flag: a real bool, or a whitelisted truthy string."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUTHY_VERDICTS
+    return False
 
-        if result["violation"]:
-            logger.warning(f"[AUDIT] Violation detected: {rule.rule_id}")
 
-            # Map priority to severity
-            severity_map = {
-                "Critical": ViolationSeverity.CRITICAL,
-                "High": ViolationSeverity.HIGH,
-                "Medium": ViolationSeverity.MEDIUM,
-                "Low": ViolationSeverity.LOW
-            }
-
-            finding = Finding(
-                rule_id=rule.rule_id,
-                rule_subject=rule.subject,
-                category=rule.category,
-                severity=severity_map.get(rule.priority, ViolationSeverity.MEDIUM),
-                logic_schema=rule.logic_schema,
-                evaluation_result=True,
-                evidence=result.get("evidence", {}),
-                calculated_value=result.get("calculated_value"),
-                threshold_value=result.get("threshold_value"),
-                description=rule.description,
-                audit_procedures=rule.audit_procedures
-            )
-            findings.append(finding)
-            rules_with_violations += 1
-        else:
-            logger.debug(f"[AUDIT] No violation for {rule.rule_id}")
+def _run_coroutine(make_coroutine: Callable[[], Coroutine]) -> Any:
+    """
+    Run a coroutine to completion from synchronous node code.
 
-        return {
-            "current_rule_index": current_index + 1,
-            "current_rule": rule,
-            "rules_checked": state.get("rules_checked", 0) + 1,
-            "rules_with_violations": rules_with_violations,
-            "findings": findings,  # Will be accumulated via Annotated[list, add]
-            "should_continue": current_index + 1 < len(rules)
-        }
+    Nodes may be invoked from inside a running event loop (async graph
+    invocation, Jupyter, an async server), where asyncio.run raises; there
+    the coroutine runs on a fresh loop in a worker thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(make_coroutine())
 
-    except Exception as e:
-        logger.error(f"[AUDIT] Error evaluating {rule.rule_id}: {e}")
-        # Continue to next rule even on error
-        return {
-            "current_rule_index": current_index + 1,
-            "rules_checked": state.get("rules_checked", 0) + 1
-        }
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="eagleeye-llm") as pool:
+        return pool.submit(lambda: asyncio.run(make_coroutine())).result()
 
 
 def report_node(state: AuditState) -> dict:
@@ -228,16 +326,11 @@ def report_node(state: AuditState) -> dict:
         end_time = time.time()
         report.execution_time_seconds = end_time - start_time
 
-        # Generate outputs
-        markdown_report = report.to_markdown()
-        json_report = report.to_json()
-
         logger.info(f"[REPORT] Generated report: {report.total_violations} violations found")
 
+        # Markdown/JSON are rendered on demand from the report object
         return {
             "report": report,
-            "report_markdown": markdown_report,
-            "report_json": json_report,
             "end_time": end_time
         }
 
@@ -246,22 +339,3 @@ def report_node(state: AuditState) -> dict:
         return {
             "error_message": f"Report generation failed: {e}"
         }
-
-
-def should_continue_audit(state: AuditState) -> str:
-    """
-    Conditional edge function to determine if audit should continue.
-
-    Args:
-        state: Current workflow state
-
-    Returns:
-        Next node name: "audit" or "report"
-    """
-    if state.get("error_message"):
-        return "report"
-
-    if state.get("should_continue", False):
-        return "audit"
-
-    return "report"
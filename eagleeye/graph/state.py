@@ -2,10 +2,9 @@
 Audit State - TypedDict definition for LangGraph workflow.
 """
 
-from typing import TypedDict, Optional, Annotated
-from operator import add
+from typing import TypedDict, Optional
 
-from eagleeye.models.document import Document, FinancialData
+from eagleeye.models.document import Document
 from eagleeye.models.rule import Rule
 from eagleeye.models.finding import Finding, AuditReport
 
@@ -19,32 +18,27 @@ class AuditState(TypedDict, total=False):
     # Input
     pdf_path: str
     check_all_rules: bool  # Whether to check all rules or use RAG retrieval
+    pdf_batch_size: Optional[int]  # Pages parsed per window (None: settings default)
 
     # Document parsing
-    document: Optional[Document]
-    raw_text: str
-    financial_data: Optional[FinancialData]
+    document: Optional[Document]  # Holds raw_text and financial_data
     extracted_keywords: list[str]
     parse_error: Optional[str]
 
     # Rule retrieval
+    run_id: Optional[str]  # Key of the runner's retrieval warm-up (see nodes.register_warm_up)
     retrieved_rules: list[Rule]
     all_rules: list[Rule]
-    current_rule_index: int
-    current_rule: Optional[Rule]
 
     # Audit evaluation
-    findings: Annotated[list[Finding], add]  # Accumulate findings
+    findings: list[Finding]  # Written once by the batched audit node
     rules_checked: int
     rules_with_violations: int
 
     # Report
-    report: Optional[AuditReport]
-    report_markdown: str
-    report_json: dict
+    report: Optional[AuditReport]  # Render with to_markdown() / to_json()
 
     # Workflow control
-    should_continue: bool
     error_message: Optional[str]
 
     # Timing
@@ -54,7 +48,9 @@ class AuditState(TypedDict, total=False):
 
 def create_initial_state(
     pdf_path: str,
-    check_all_rules: bool = True
+    check_all_rules: bool = True,
+    pdf_batch_size: Optional[int] = None,
+    run_id: Optional[str] = None
 ) -> AuditState:
     """
     Create initial state for audit workflow.
@@ -62,6 +58,8 @@ def create_initial_state(
     Args:
         pdf_path: Path to PDF file to audit
         check_all_rules: Whether to check all rules or use retrieval
+        pdf_batch_size: Pages parsed per window (default: settings.pdf.page_batch_size)
+        run_id: Run whose retrieval warm-up retrieve_node waits on
 
     Returns:
         Initial AuditState
@@ -71,22 +69,17 @@ def create_initial_state(
     return AuditState(
         pdf_path=pdf_path,
         check_all_rules=check_all_rules,
+        pdf_batch_size=pdf_batch_size,
         document=None,
-        raw_text="",
-        financial_data=None,
         extracted_keywords=[],
         parse_error=None,
+        run_id=run_id,
         retrieved_rules=[],
         all_rules=[],
-        current_rule_index=0,
-        current_rule=None,
         findings=[],
         rules_checked=0,
         rules_with_violations=0,
         report=None,
-        report_markdown="",
-        report_json={},
-        should_continue=True,
         error_message=None,
         start_time=time.time(),
         end_time=0.0
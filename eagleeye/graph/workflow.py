@@ -2,20 +2,22 @@
 Audit Workflow - LangGraph state machine for audit orchestration.
 """
 
-from typing import Optional
+import contextlib
+import uuid
+from typing import Iterator, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
 from loguru import logger
 from langgraph.graph import StateGraph, END
 
-import sys
-sys.path.insert(0, str(__file__).rsplit("\\", 3)[0])
-
+from eagleeye.rag.indexer import RuleIndexer
+from eagleeye.rag.retriever import RuleRetriever
 from eagleeye.graph.state import AuditState, create_initial_state
 from eagleeye.graph.nodes import (
     parse_node,
     retrieve_node,
     audit_node,
     report_node,
-    should_continue_audit
+    register_warm_up
 )
 
 
@@ -24,7 +26,7 @@ def build_audit_workflow() -> StateGraph:
     Build the LangGraph workflow for financial document auditing.
 
     Flow:
-        parse -> retrieve -> audit (loop) -> report
+        parse -> retrieve -> audit (all rules) -> report
 
     Returns:
         Compiled StateGraph
@@ -50,15 +52,8 @@ def build_audit_workflow() -> StateGraph:
     # retrieve -> audit
     workflow.add_edge("retrieve", "audit")
 
-    # audit -> conditional (audit or report)
-    workflow.add_conditional_edges(
-        "audit",
-        should_continue_audit,
-        {
-            "audit": "audit",
-            "report": "report"
-        }
-    )
+    # audit -> report (audit_node checks every rule in one step)
+    workflow.add_edge("audit", "report")
 
     # report -> END
     workflow.add_edge("report", END)
@@ -70,6 +65,21 @@ def build_audit_workflow() -> StateGraph:
     return compiled
 
 
+def _warm_up_retrieval(check_all_rules: bool):
+    """
+    Load the rulebook (and, for RAG runs, the embedding model) ahead of
+    retrieve_node, which then picks up the shared cache.
+
+    Args:
+        check_all_rules: Whether the run checks all rules or uses RAG
+    """
+    # For RAG runs, the model loads while the rulebook is parsed
+    retriever = RuleRetriever(RuleIndexer(preload_embeddings=not check_all_rules))
+    retriever.load_rules_to_cache()
+    if not check_all_rules:
+        retriever.indexer.ensure_embedding_function()
+
+
 class AuditWorkflowRunner:
     """
     Runner class for executing audit workflows.
@@ -78,6 +88,27 @@ class AuditWorkflowRunner:
     def __init__(self):
         """Initialize workflow runner."""
         self._workflow = None
+        self._warm_up: Optional[Future] = None
+
+    @contextlib.contextmanager
+    def _retrieval_warm_up(self, check_all_rules: bool) -> Iterator[str]:
+        """
+        Warm up rule retrieval in the background while the PDF is parsed.
+
+        Yields the run ID under which retrieve_node finds the warm-up; the
+        pool is shut down when the run ends.
+        """
+        run_id = uuid.uuid4().hex
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="eagleeye-warmup")
+        self._warm_up = pool.submit(_warm_up_retrieval, check_all_rules)
+        register_warm_up(run_id, self._warm_up)
+        try:
+            yield run_id
+        finally:
+            register_warm_up(run_id, None)
+            self._warm_up = None
+            # Normally already finished; an aborted run does not wait for it
+            pool.shutdown(wait=False, cancel_futures=True)
 
     @property
     def workflow(self):
@@ -90,7 +121,8 @@ class AuditWorkflowRunner:
         self,
         pdf_path: str,
         check_all_rules: bool = True,
-        stream: bool = False
+        stream: bool = False,
+        pdf_batch_size: Optional[int] = None
     ) -> AuditState:
         """
         Run audit workflow on a PDF document.
@@ -99,30 +131,36 @@ class AuditWorkflowRunner:
             pdf_path: Path to PDF file
             check_all_rules: Whether to check all rules or use RAG
             stream: Whether to stream intermediate states
+            pdf_batch_size: Pages parsed per window (default: settings.pdf.page_batch_size)
 
         Returns:
             Final AuditState with results
         """
         logger.info(f"Starting audit workflow for: {pdf_path}")
-
-        # Create initial state
-        initial_state = create_initial_state(
-            pdf_path=pdf_path,
-            check_all_rules=check_all_rules
-        )
-
+        with self._retrieval_warm_up(check_all_rules) as run_id:
+            # Create initial state
+            initial_state = create_initial_state(
+                pdf_path=pdf_path,
+                check_all_rules=check_all_rules,
+                pdf_batch_size=pdf_batch_size,
+                run_id=run_id
+            )
+            return self._run(initial_state, stream)
+
+    def _run(self, initial_state: AuditState, stream: bool) -> AuditState:
+        """Execute the workflow from an initial state."""
         if stream:
-            # Stream mode - yield intermediate states
-            final_state = None
-            for state in self.workflow.stream(initial_state):
+            # Stream mode - full state after each step; the last one is final
+            final_state = initial_state
+            for state in self.workflow.stream(initial_state, stream_mode="values"):
+                # Log progress once per change in checked rules
+                checked = state.get("rules_checked", 0)
+                if checked != final_state.get("rules_checked", 0):
+                    logger.info(
+                        "Progress: {}/{} rules checked",
+                        checked, len(state.get("retrieved_rules", []))
+                    )
                 final_state = state
-                # Log progress
-                if "audit" in state:
-                    audit_state = state["audit"]
-                    if "current_rule_index" in audit_state:
-                        idx = audit_state["current_rule_index"]
-                        total = len(audit_state.get("retrieved_rules", []))
-                        logger.info(f"Progress: {idx}/{total} rules checked")
             return final_state
         else:
             # Invoke mode - run to completion
@@ -145,31 +183,40 @@ class AuditWorkflowRunner:
             pdf_path: Path to PDF file
             on_parse: Callback after parsing
             on_retrieve: Callback after retrieval
-            on_audit: Callback after each rule audit
+            on_audit: Callback after the audit step
             on_report: Callback after report generation
             check_all_rules: Whether to check all rules
 
         Returns:
             Final AuditState
         """
-        initial_state = create_initial_state(
-            pdf_path=pdf_path,
-            check_all_rules=check_all_rules
-        )
-
-        final_state = None
-        for event in self.workflow.stream(initial_state):
-            for node_name, node_state in event.items():
-                if node_name == "parse" and on_parse:
-                    on_parse(node_state)
-                elif node_name == "retrieve" and on_retrieve:
-                    on_retrieve(node_state)
-                elif node_name == "audit" and on_audit:
-                    on_audit(node_state)
-                elif node_name == "report" and on_report:
-                    on_report(node_state)
-
-                final_state = node_state
+        callbacks = {
+            "parse": on_parse,
+            "retrieve": on_retrieve,
+            "audit": on_audit,
+            "report": on_report
+        }
+
+        with self._retrieval_warm_up(check_all_rules) as run_id:
+            initial_state = create_initial_state(
+                pdf_path=pdf_path,
+                check_all_rules=check_all_rules,
+                run_id=run_id
+            )
+            return self._stream_with_callbacks(initial_state, callbacks)
+
+    def _stream_with_callbacks(self, initial_state: AuditState, callbacks: dict) -> AuditState:
+        """Stream the workflow from an initial state, passing node updates to callbacks."""
+        # Callbacks get each node's update; the returned state is the merged one
+        final_state = initial_state
+        for mode, chunk in self.workflow.stream(initial_state, stream_mode=["updates", "values"]):
+            if mode == "values":
+                final_state = chunk
+                continue
+            for node_name, node_state in chunk.items():
+                callback = callbacks.get(node_name)
+                if callback:
+                    callback(node_state)
 
         return final_state
 
@@ -177,7 +224,8 @@ class AuditWorkflowRunner:
 def run_audit(
     pdf_path: str,
     check_all_rules: bool = True,
-    output_path: Optional[str] = None
+    output_path: Optional[str] = None,
+    pdf_batch_size: Optional[int] = None
 ) -> dict:
     """
     Convenience function to run a complete audit.
@@ -186,17 +234,20 @@ def run_audit(
         pdf_path: Path to PDF file
         check_all_rules: Whether to check all rules
         output_path: Optional path to save report
+        pdf_batch_size: Pages parsed per window (default: settings.pdf.page_batch_size)
 
     Returns:
         Audit results dict
     """
     runner = AuditWorkflowRunner()
-    result = runner.run(pdf_path, check_all_rules=check_all_rules)
+    result = runner.run(pdf_path, check_all_rules=check_all_rules, pdf_batch_size=pdf_batch_size)
+    report = result.get("report")
+    markdown = report.to_markdown() if report is not None else ""
 
     # Save report if output path provided
-    if output_path and "report_markdown" in result:
+    if output_path and report is not None:
         with open(output_path, "w", encoding="utf-8") as f:
-            f.write(result["report_markdown"])
+            f.write(markdown)
         logger.info(f"Report saved to: {output_path}")
 
     return {
@@ -204,8 +255,8 @@ def run_audit(
         "rules_checked": result.get("rules_checked", 0),
         "violations_found": result.get("rules_with_violations", 0),
         "findings": result.get("findings", []),
-        "report": result.get("report"),
-        "markdown": result.get("report_markdown", ""),
-        "json": result.get("report_json", {}),
+        "report": report,
+        "markdown": markdown,
+        "json": report.to_json() if report is not None else {},
         "error": result.get("error_message")
     }
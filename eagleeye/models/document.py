@@ -2,6 +2,9 @@
 Document data models for parsed PDF content.
 """
 
+import dataclasses
+import functools
+import re
 from typing import Any, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
@@ -18,18 +21,23 @@ class TableData(BaseModel):
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for financial data extraction."""
-        result = {}
-        for row in self.rows:
-            if len(row) >= 2:
-                key = row[0].strip()
-                value = row[-1].strip()
-                if key:
-                    result[key] = value
-        return result
+        if not self.rows:
+            return {}
+        return {
+            key: row[-1].strip()
+            for row in self.rows
+            if len(row) >= 2 and (key := row[0].strip())
+        }
 
 
-class FinancialData(BaseModel):
-    """Extracted financial data from document."""
+@dataclasses.dataclass(slots=True)
+class FinancialData:
+    """
+    Extracted financial data from document.
+
+    A slotted dataclass rather than a pydantic model: values come from our
+    own extraction code, so per-field validation buys nothing.
+    """
 
     # 资产负债表 (Balance Sheet)
     货币资金: Optional[float] = None
@@ -119,7 +127,7 @@ class FinancialData(BaseModel):
     在建工程_资本化利息: Optional[float] = None
 
     # 历史数据
-    最近3年_经营活动现金流量净额: list[float] = Field(default_factory=list)
+    最近3年_经营活动现金流量净额: list[float] = dataclasses.field(default_factory=list)
 
     # 行业数据
     行业上年度平均资产负债率: Optional[float] = None
@@ -138,7 +146,7 @@ class FinancialData(BaseModel):
     # 债券相关
     债券发行日_前后30天内_其他应收款_新增额: Optional[float] = None
     债券发行额: Optional[float] = None
-    其他应收款_交易对象: list[str] = Field(default_factory=list)
+    其他应收款_交易对象: list[str] = dataclasses.field(default_factory=list)
     募集资金总额: Optional[float] = None
     募集说明书_承诺偿还金额: Optional[float] = None
 
@@ -158,19 +166,27 @@ class FinancialData(BaseModel):
     资产处置收益: Optional[float] = None
     无偿划转批复文件: Optional[str] = None
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "FinancialData":
+        """Build from a dict of field values, ignoring keys that are not fields."""
+        return cls(**{key: value for key, value in data.items() if key in _FINANCIAL_FIELD_SET})
+
     def get(self, key: str, default: Any = None) -> Any:
         """Get attribute value with default."""
         return getattr(self, key, default)
 
     def to_eval_dict(self) -> dict[str, Any]:
-        """Convert to dictionary for logic evaluation."""
-        result = {}
-        for field_name, field_value in self:
-            if field_value is not None:
-                # Replace Chinese field names with underscored versions
-                key = field_name.replace("_", "_")
-                result[key] = field_value
-        return result
+        """Convert to dictionary for logic evaluation, dropping unset fields."""
+        return {
+            name: value
+            for name in _FINANCIAL_FIELDS
+            if (value := getattr(self, name)) is not None
+        }
+
+
+# Field names in declaration order, computed once
+_FINANCIAL_FIELDS = tuple(f.name for f in dataclasses.fields(FinancialData))
+_FINANCIAL_FIELD_SET = frozenset(_FINANCIAL_FIELDS)
 
 
 class Document(BaseModel):
@@ -189,20 +205,61 @@ class Document(BaseModel):
     @property
     def text_density(self) -> float:
         """Calculate average text density per page."""
-        if self.total_pages == 0:
-            return 0
+        if not self.total_pages or not self.raw_text:
+            return 0.0
         return len(self.raw_text) / self.total_pages
 
     def extract_keywords(self) -> list[str]:
         """Extract potential keywords from document text."""
-        # Common financial terms
-        keywords = []
-        terms = [
-            "政府补助", "营业外收入", "递延收益", "在建工程", "存货",
-            "应收账款", "其他应收款", "短期借款", "长期借款", "有息债务",
-            "经营活动现金流", "投资活动", "筹资活动", "贸易收入", "毛利率"
-        ]
-        for term in terms:
-            if term in self.raw_text:
-                keywords.append(term)
-        return keywords
+        if not self.raw_text:
+            return []
+        # Single pass over the text for all terms; keep the terms' order
+        found = _find_terms(self.raw_text)
+        return [term for term in _KEYWORD_TERMS if term in found]
+
+
+# Common financial terms
+_KEYWORD_TERMS = (
+    "政府补助", "营业外收入", "递延收益", "在建工程", "存货",
+    "应收账款", "其他应收款", "短期借款", "长期借款", "有息债务",
+    "经营活动现金流", "投资活动", "筹资活动", "贸易收入", "毛利率"
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _keyword_matcher():
+    """Build a multi-pattern matcher for the keyword terms once."""
+    try:
+        import ahocorasick
+    except ImportError:
+        ahocorasick = None
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for term in _KEYWORD_TERMS:
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+        return lambda text: {term for _, term in automaton.iter(text)}
+
+    # pyahocorasick not installed: one regex scan, longest term first at each
+    # position. A term hidden behind a longer one starting at the same
+    # position is a prefix of it, so it is added back from the prefix map.
+    ordered = sorted(_KEYWORD_TERMS, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+    prefixes = {
+        term: {other for other in _KEYWORD_TERMS if other != term and term.startswith(other)}
+        for term in _KEYWORD_TERMS
+    }
+
+    def match(text: str) -> set[str]:
+        found = set(pattern.findall(text))
+        for term in list(found):
+            found |= prefixes[term]
+        return found
+
+    return match
+
+
+def _find_terms(text: str) -> set[str]:
+    """Return the keyword terms that occur in text."""
+    return _keyword_matcher()(text)
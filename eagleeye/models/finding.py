@@ -2,11 +2,19 @@
 Finding data models for audit results.
 """
 
-from typing import Optional, Any
-from pydantic import BaseModel, Field
+import json
+from collections import Counter
+from types import MappingProxyType
+from typing import Optional, Any, KeysView
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from datetime import datetime
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # orjson not installed, fall back to stdlib json
+
 
 class ViolationSeverity(str, Enum):
     """Severity levels for violations."""
@@ -16,9 +24,37 @@ class ViolationSeverity(str, Enum):
     LOW = "Low"
 
 
+# Markdown rendering constants (read-only, shared by all renders)
+_SEVERITY_EMOJI = MappingProxyType({
+    ViolationSeverity.CRITICAL: "🔴",
+    ViolationSeverity.HIGH: "🟠",
+    ViolationSeverity.MEDIUM: "🟡",
+    ViolationSeverity.LOW: "🟢"
+})
+
+_SEVERITY_ORDER = (
+    ViolationSeverity.CRITICAL,
+    ViolationSeverity.HIGH,
+    ViolationSeverity.MEDIUM,
+    ViolationSeverity.LOW
+)
+
+_CATEGORY_NAMES = MappingProxyType({
+    "CL": "交叉勾稽 (Cross-Ledger)",
+    "FM": "财务造假 (Financial Manipulation)",
+    "LC": "合规监管 (Legal Compliance)",
+    "OP": "经营风险 (Operational Risk)"
+})
+
+
 class Finding(BaseModel):
     """Represents a single audit finding/violation."""
 
+    # Fields cannot be reassigned once recorded; reports index and cache them.
+    # evidence / audit_procedures stay a mutable dict / list, so not hashable.
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    __hash__ = None
+
     rule_id: str = Field(..., description="Rule that was violated")
     rule_subject: str = Field(..., description="Rule subject/title")
     category: str = Field(..., description="Rule category")
@@ -37,17 +73,34 @@ class Finding(BaseModel):
 
     detected_at: datetime = Field(default_factory=datetime.now)
 
+    # Rendered once; fields cannot be reassigned, so the output never goes stale
+    _markdown_lines_cache: Optional[tuple[str, ...]] = PrivateAttr(default=None)
+    _markdown_cache: Optional[str] = PrivateAttr(default=None)
+
+    def model_copy(self, *, update: Optional[dict[str, Any]] = None, deep: bool = False) -> "Finding":
+        """Copy the finding, dropping rendered markdown when fields change."""
+        copy = super().model_copy(update=update, deep=deep)
+        if update:
+            copy._markdown_lines_cache = None
+            copy._markdown_cache = None
+        return copy
+
     def to_markdown(self) -> str:
         """Generate markdown summary of finding."""
-        severity_emoji = {
-            ViolationSeverity.CRITICAL: "🔴",
-            ViolationSeverity.HIGH: "🟠",
-            ViolationSeverity.MEDIUM: "🟡",
-            ViolationSeverity.LOW: "🟢"
-        }
-
+        if self._markdown_cache is None:
+            self._markdown_cache = "\n".join(self._markdown_lines())
+        return self._markdown_cache
+
+    def _markdown_lines(self) -> tuple[str, ...]:
+        """Markdown lines for this finding, for joining into larger documents."""
+        if self._markdown_lines_cache is None:
+            self._markdown_lines_cache = tuple(self._render_markdown_lines())
+        return self._markdown_lines_cache
+
+    def _render_markdown_lines(self) -> list[str]:
+        """Render the markdown lines for this finding."""
         lines = [
-            f"### {severity_emoji.get(self.severity, '⚪')} {self.rule_id}: {self.rule_subject}",
+            f"### {_SEVERITY_EMOJI.get(self.severity, '⚪')} {self.rule_id}: {self.rule_subject}",
             "",
             f"**严重程度**: {self.severity.value}",
             f"**类别**: {self.category}",
@@ -55,28 +108,26 @@ class Finding(BaseModel):
             f"**描述**: {self.description}",
             "",
             "**检测逻辑**:",
-            f"```",
-            f"{self.logic_schema}",
-            f"```",
+            "```",
+            self.logic_schema,
+            "```",
             "",
         ]
 
         if self.evidence:
             lines.append("**相关数据**:")
-            for key, value in self.evidence.items():
-                if isinstance(value, float):
-                    lines.append(f"- {key}: {value:,.2f}")
-                else:
-                    lines.append(f"- {key}: {value}")
+            lines.extend(
+                f"- {key}: {value:,.2f}" if isinstance(value, float) else f"- {key}: {value}"
+                for key, value in self.evidence.items()
+            )
             lines.append("")
 
         if self.audit_procedures:
             lines.append("**建议审计程序**:")
-            for i, proc in enumerate(self.audit_procedures, 1):
-                lines.append(f"{i}. {proc}")
+            lines.extend(f"{i}. {proc}" for i, proc in enumerate(self.audit_procedures, 1))
             lines.append("")
 
-        return "\n".join(lines)
+        return lines
 
 
 class AuditReport(BaseModel):
@@ -102,26 +153,121 @@ class AuditReport(BaseModel):
 
     execution_time_seconds: float = 0.0
 
+    # Findings indexed by severity and rule ID, maintained by add_finding
+    _by_severity: dict[ViolationSeverity, list[Finding]] = PrivateAttr(default_factory=dict)
+    _by_id: dict[str, Finding] = PrivateAttr(default_factory=dict)
+
+    # Serialized forms built once by finalize(), dropped whenever a field changes
+    _finalized: bool = PrivateAttr(default=False)
+    _json_cache: Optional[dict] = PrivateAttr(default=None)
+    _markdown_cache: Optional[str] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context):
+        """Index findings passed in at construction time."""
+        for finding in self.findings:
+            self._index_finding(finding)
+
+    def __setattr__(self, name: str, value: Any):
+        """
+        Keep the indexes and serialized caches in step with field assignments.
+
+        In-place edits of mutable fields (e.g. report.findings.append) bypass
+        this; use add_findings, or reassign the field.
+        """
+        super().__setattr__(name, value)
+        if name not in type(self).model_fields:
+            return
+        self._invalidate()
+        if name == "findings":
+            self._by_severity = {}
+            self._by_id = {}
+            for finding in value:
+                self._index_finding(finding)
+
+    def _invalidate(self):
+        """Drop the serialized forms cached by finalize()."""
+        if self._finalized:
+            self._finalized = False
+            self._json_cache = None
+            self._markdown_cache = None
+
+    def _index_finding(self, finding: Finding):
+        """Add a finding to the severity and rule ID indexes."""
+        self._by_severity.setdefault(finding.severity, []).append(finding)
+        self._by_id.setdefault(finding.rule_id, finding)
+
+    def findings_by_severity(self, severity: ViolationSeverity) -> list[Finding]:
+        """Get findings of a given severity, in insertion order."""
+        return self._by_severity.get(severity, [])
+
+    @property
+    def risk_score(self) -> int:
+        """Severity-weighted violation score (Critical 10, High 5, Medium 2, Low 1)."""
+        return (
+            self.critical_count * 10 +
+            self.high_count * 5 +
+            self.medium_count * 2 +
+            self.low_count * 1
+        )
+
+    def get_finding(self, rule_id: str) -> Optional[Finding]:
+        """Get the first finding recorded for a rule, if any."""
+        return self._by_id.get(rule_id)
+
+    @property
+    def rule_ids(self) -> KeysView[str]:
+        """IDs of all rules with findings in this report (supports set operations)."""
+        return self._by_id.keys()
+
+    def finalize(self) -> "AuditReport":
+        """
+        Freeze the findings and cache the JSON and markdown serializations.
+
+        Returns:
+            This report, for chaining
+        """
+        if not self._finalized:
+            self._json_cache = self.to_json()
+            self._markdown_cache = self.to_markdown()
+            self._finalized = True
+        return self
+
     def add_finding(self, finding: Finding):
         """Add a finding and update counts."""
-        self.findings.append(finding)
-        self.total_violations += 1
-
-        # Update severity counts
-        if finding.severity == ViolationSeverity.CRITICAL:
-            self.critical_count += 1
-        elif finding.severity == ViolationSeverity.HIGH:
-            self.high_count += 1
-        elif finding.severity == ViolationSeverity.MEDIUM:
-            self.medium_count += 1
-        else:
-            self.low_count += 1
+        self.add_findings((finding,))
+
+    def add_findings(self, findings: list[Finding]):
+        """Add several findings, updating the severity and category counts once."""
+        if not findings:
+            return
+        # Findings changed, serialized forms are stale
+        self._invalidate()
+
+        self.findings.extend(findings)
+        for finding in findings:
+            self._index_finding(finding)
+        self.total_violations += len(findings)
+
+        # Update severity counts; anything below Medium counts as Low
+        severities = Counter(finding.severity for finding in findings)
+        self.critical_count += severities[ViolationSeverity.CRITICAL]
+        self.high_count += severities[ViolationSeverity.HIGH]
+        self.medium_count += severities[ViolationSeverity.MEDIUM]
+        self.low_count += len(findings) - (
+            severities[ViolationSeverity.CRITICAL]
+            + severities[ViolationSeverity.HIGH]
+            + severities[ViolationSeverity.MEDIUM]
+        )
 
         # Update category summary
-        self.category_summary[finding.category] = self.category_summary.get(finding.category, 0) + 1
+        for category, count in Counter(finding.category for finding in findings).items():
+            self.category_summary[category] = self.category_summary.get(category, 0) + count
 
     def to_markdown(self) -> str:
         """Generate full markdown report."""
+        if self._finalized:
+            return self._markdown_cache
+
         lines = [
             "# EagleEye Lite 审计报告",
             "",
@@ -154,15 +300,10 @@ class AuditReport(BaseModel):
                 "| 类别 | 数量 |",
                 "|------|------|",
             ])
-            category_names = {
-                "CL": "交叉勾稽 (Cross-Ledger)",
-                "FM": "财务造假 (Financial Manipulation)",
-                "LC": "合规监管 (Legal Compliance)",
-                "OP": "经营风险 (Operational Risk)"
-            }
-            for cat, count in sorted(self.category_summary.items()):
-                cat_name = category_names.get(cat, cat)
-                lines.append(f"| {cat_name} | {count} |")
+            lines.extend(
+                f"| {_CATEGORY_NAMES.get(cat, cat)} | {count} |"
+                for cat, count in sorted(self.category_summary.items())
+            )
             lines.append("")
 
         lines.extend([
@@ -172,21 +313,14 @@ class AuditReport(BaseModel):
             "",
         ])
 
-        # Group findings by severity
-        severity_order = [
-            ViolationSeverity.CRITICAL,
-            ViolationSeverity.HIGH,
-            ViolationSeverity.MEDIUM,
-            ViolationSeverity.LOW
-        ]
-
-        for severity in severity_order:
-            severity_findings = [f for f in self.findings if f.severity == severity]
+        # Findings are already bucketed by severity in the index
+        for severity in _SEVERITY_ORDER:
+            severity_findings = self.findings_by_severity(severity)
             if severity_findings:
                 lines.append(f"## {severity.value} 级别发现 ({len(severity_findings)})")
                 lines.append("")
                 for finding in severity_findings:
-                    lines.append(finding.to_markdown())
+                    lines.extend(finding._markdown_lines())
                     lines.append("---")
                     lines.append("")
 
@@ -197,6 +331,32 @@ class AuditReport(BaseModel):
 
     def to_json(self) -> dict:
         """Export report as JSON-serializable dict."""
+        if self._finalized:
+            # Shallow copy, so callers cannot edit the cached top-level keys
+            return dict(self._json_cache)
+        return self._json_payload("json")
+
+    def to_json_bytes(self, indent: bool = False) -> bytes:
+        """
+        Serialize the report to UTF-8 JSON in one pass.
+
+        Args:
+            indent: Pretty-print with two-space indentation
+
+        Returns:
+            Encoded JSON document
+        """
+        if orjson is None:
+            return json.dumps(
+                self.to_json(), ensure_ascii=False, indent=2 if indent else None, default=str
+            ).encode("utf-8")
+
+        # orjson encodes datetimes and enums itself, so skip pydantic's JSON mode
+        payload = self._json_cache if self._finalized else self._json_payload("python")
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    def _json_payload(self, mode: str) -> dict:
+        """Build the report dict, dumping findings in the given pydantic mode."""
         return {
             "document_name": self.document_name,
             "document_path": self.document_path,
@@ -212,6 +372,6 @@ class AuditReport(BaseModel):
                 },
                 "by_category": self.category_summary
             },
-            "findings": [f.model_dump() for f in self.findings],
+            "findings": [f.model_dump(mode=mode) for f in self.findings],
             "execution_time_seconds": self.execution_time_seconds
         }
@@ -2,13 +2,26 @@
 Rule data model for audit rules.
 """
 
+import functools
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads  # orjson not installed, fall back to stdlib json
 
 
 class Rule(BaseModel):
     """Represents an audit rule from the rulebook."""
 
+    # Fields cannot be reassigned once loaded; cached properties rely on it.
+    # The keyword / procedure lists stay mutable lists, so not hashable.
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    __hash__ = None
+
     rule_id: str = Field(..., description="Unique rule identifier (e.g., CL-001)")
     category: str = Field(..., description="Rule category: CL/FM/LC/OP")
     subject: str = Field(..., description="Rule subject/title in Chinese")
@@ -25,32 +38,92 @@ class Rule(BaseModel):
         """Check if rule is critical priority."""
         return self.priority == "Critical"
 
-    @property
+    # Rules are read-only once loaded, so derived text is computed once
+
+    @functools.cached_property
     def searchable_text(self) -> str:
         """Generate text for embedding and search."""
-        keywords = " ".join(self.trigger_keywords)
-        return f"{self.subject} {keywords} {self.description}"
+        return _searchable_text(self.subject, self.trigger_keywords, self.description)
+
+    @functools.cached_property
+    def index_metadata(self) -> dict:
+        """ChromaDB metadata for this rule."""
+        return _index_metadata(
+            self.rule_id, self.category, self.subject, self.priority, self.trigger_keywords
+        )
 
     def to_index_document(self) -> dict:
         """Convert to document format for ChromaDB indexing."""
         return {
             "id": self.rule_id,
             "document": self.searchable_text,
-            "metadata": {
-                "rule_id": self.rule_id,
-                "category": self.category,
-                "subject": self.subject,
-                "priority": self.priority,
-                "keywords": ",".join(self.trigger_keywords),
-            }
+            "metadata": self.index_metadata
         }
 
     @classmethod
-    def from_jsonl_line(cls, line: str) -> Optional["Rule"]:
-        """Parse a rule from JSONL line."""
-        import json
+    def from_jsonl_line(cls, line: str | bytes, validate: bool = True) -> Optional["Rule"]:
+        """
+        Parse a rule from a JSONL line (str or raw bytes).
+
+        Args:
+            line: One rulebook line
+            validate: Fully validate the line. Loaders of trusted rulebooks
+                validate the first line of each file as a schema smoke test
+                and pass False for the rest, which are only checked for
+                required fields and built with model_construct().
+        """
         try:
-            data = json.loads(line.strip())
-            return cls(**data)
-        except (json.JSONDecodeError, ValueError):
+            data = _json_loads(line)
+            if validate:
+                return cls.model_validate(data)
+            if not isinstance(data, dict) or not _REQUIRED_FIELDS <= data.keys():
+                return None
+            return cls.model_construct(**data)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def index_document_from_jsonl_line(line: str | bytes) -> Optional[dict]:
+        """
+        Build the to_index_document() dict straight from a JSONL line,
+        without constructing a Rule, for index-only flows.
+        """
+        try:
+            data = _json_loads(line)
+        except ValueError:
+            return None
+        if not isinstance(data, dict) or not _REQUIRED_FIELDS <= data.keys():
             return None
+
+        keywords = data.get("trigger_keywords") or []
+        return {
+            "id": data["rule_id"],
+            "document": _searchable_text(data["subject"], keywords, data["description"]),
+            "metadata": _index_metadata(
+                data["rule_id"], data["category"], data["subject"], data["priority"], keywords
+            )
+        }
+
+
+def _searchable_text(subject: str, keywords: list[str], description: str) -> str:
+    """Text embedded for a rule: subject, trigger keywords and description."""
+    return f"{subject} {' '.join(keywords)} {description}"
+
+
+def _index_metadata(
+    rule_id: str, category: str, subject: str, priority: str, keywords: list[str]
+) -> dict:
+    """ChromaDB metadata for a rule."""
+    return {
+        "rule_id": rule_id,
+        "category": category,
+        "subject": subject,
+        "priority": priority,
+        "keywords": ",".join(keywords),
+    }
+
+
+# Fields without defaults; lines missing any of them are rejected
+_REQUIRED_FIELDS = frozenset(
+    name for name, field in Rule.model_fields.items() if field.is_required()
+)
@@ -2,19 +2,43 @@
 Rule Indexer - ChromaDB-based indexing for audit rules.
 """
 
+import copy
+import hashlib
 import json
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
-from loguru import logger
-import chromadb
-from chromadb.config import Settings as ChromaSettings
+from typing import TYPE_CHECKING, Optional
 
-import sys
-sys.path.insert(0, str(__file__).rsplit("\\", 3)[0])
+import numpy as np
+from loguru import logger
 
 from config.settings import settings
 from eagleeye.models.rule import Rule
 
+if TYPE_CHECKING:
+    # chromadb is heavy to import; it is loaded on first client access
+    import chromadb
+
+# Below this many rulebook lines, index parsing runs inline rather than in a pool
+_MIN_PARALLEL_LINES = 4096
+
+# Suffix of the per-document files in settings.rag.embedding_cache_dir
+_EMBEDDING_CACHE_SUFFIX = ".npy"
+
+# Reduced-precision encoders by (model name, device, dtype). Chroma shares one
+# SentenceTransformer per model name, so each precision gets a private copy
+# that is converted once per process.
+_precision_models: dict[tuple[str, str, str], object] = {}
+_precision_lock = threading.Lock()
+
+# Times this process changed each (persist_directory, collection_name);
+# retrievers key cached search results and embeddings on it
+_collection_versions: dict[tuple[str, str], int] = {}
+_collection_versions_lock = threading.Lock()
+
 
 class RuleIndexer:
     """
@@ -27,7 +51,8 @@ class RuleIndexer:
         self,
         collection_name: str = None,
         persist_directory: str = None,
-        embedding_model: str = None
+        embedding_model: str = None,
+        preload_embeddings: bool = False
     ):
         """
         Initialize rule indexer.
@@ -36,19 +61,30 @@ class RuleIndexer:
             collection_name: ChromaDB collection name
             persist_directory: Directory for persistent storage
             embedding_model: Sentence transformer model name
+            preload_embeddings: Start loading the embedding model in a
+                background thread now, overlapping it with rulebook parsing
         """
         self.collection_name = collection_name or settings.rag.collection_name
         self.persist_directory = persist_directory or settings.rag.persist_directory
         self.embedding_model = embedding_model or settings.rag.embedding_model
 
-        self._client: Optional[chromadb.Client] = None
+        self._client: Optional["chromadb.ClientAPI"] = None
         self._collection = None
         self._embedding_function = None
+        self._embedding_future: Optional[Future] = None
+
+        if preload_embeddings:
+            pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-preload")
+            self._embedding_future = pool.submit(self._load_embedding_function)
+            pool.shutdown(wait=False)
 
     @property
-    def client(self) -> chromadb.Client:
+    def client(self) -> "chromadb.ClientAPI":
         """Lazy initialization of ChromaDB client."""
         if self._client is None:
+            import chromadb
+            from chromadb.config import Settings as ChromaSettings
+
             logger.info(f"Initializing ChromaDB at {self.persist_directory}")
             self._client = chromadb.PersistentClient(
                 path=self.persist_directory,
@@ -58,14 +94,38 @@ class RuleIndexer:
 
     @property
     def embedding_function(self):
-        """Lazy load embedding function."""
+        """Lazy load embedding function (waits for a preload if one is running)."""
+        self.ensure_embedding_function()
+        return self._embedding_function
+
+    def ensure_embedding_function(self):
+        """Load the embedding model now instead of on first use."""
         if self._embedding_function is None:
-            from chromadb.utils import embedding_functions
-            logger.info(f"Loading embedding model: {self.embedding_model}")
-            self._embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name=self.embedding_model
+            if self._embedding_future is not None:
+                self._embedding_function = self._embedding_future.result()
+            else:
+                self._embedding_function = self._load_embedding_function()
+
+    def _load_embedding_function(self):
+        """Build the configured embedding function (loads the model)."""
+        logger.info(f"Loading embedding model: {self.embedding_model}")
+        if settings.rag.embedding_backend == "onnx":
+            from eagleeye.rag.onnx_embedding import OnnxEmbeddingFunction
+            return OnnxEmbeddingFunction(
+                model_name=self.embedding_model,
+                quantize=settings.rag.embedding_dtype == "int8",
+                cache_dir=str(Path(self.persist_directory) / "onnx")
             )
-        return self._embedding_function
+
+        from chromadb.utils import embedding_functions
+        device = _embedding_device()
+        function = embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name=self.embedding_model,
+            device=device,
+            normalize_embeddings=True
+        )
+        function._model = _with_precision(self.embedding_model, function._model, device)
+        return function
 
     @property
     def collection(self):
@@ -78,6 +138,17 @@ class RuleIndexer:
             )
         return self._collection
 
+    @property
+    def collection_version(self) -> int:
+        """How many times this process has changed the collection's contents."""
+        return _collection_versions.get((self.persist_directory, self.collection_name), 0)
+
+    def _collection_changed(self):
+        """Record a change to the collection, invalidating retriever caches built on it."""
+        key = (self.persist_directory, self.collection_name)
+        with _collection_versions_lock:
+            _collection_versions[key] = _collection_versions.get(key, 0) + 1
+
     def load_rules_from_jsonl(self, jsonl_path: str | Path) -> list[Rule]:
         """
         Load rules from JSONL file.
@@ -89,21 +160,26 @@ class RuleIndexer:
             List of Rule objects
         """
         jsonl_path = Path(jsonl_path)
+        logger.info(f"Loading rules from {jsonl_path}")
+        return self._parse_rules(jsonl_path.read_bytes())
+
+    def _parse_rules(self, data: bytes) -> list[Rule]:
+        """Parse rules from raw JSONL bytes."""
         rules = []
 
-        logger.info(f"Loading rules from {jsonl_path}")
+        # Split at byte level; JSON decoders take the bytes directly
+        lines = data.splitlines()
 
-        with open(jsonl_path, "r", encoding="utf-8") as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
+        for line_num, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
 
-                rule = Rule.from_jsonl_line(line)
-                if rule:
-                    rules.append(rule)
-                else:
-                    logger.warning(f"Failed to parse rule at line {line_num}")
+            # Fully validate the first rule of every file, trust the rest
+            rule = Rule.from_jsonl_line(line, validate=not rules)
+            if rule:
+                rules.append(rule)
+            else:
+                logger.warning(f"Failed to parse rule at line {line_num}")
 
         logger.info(f"Loaded {len(rules)} rules")
         return rules
@@ -119,54 +195,262 @@ class RuleIndexer:
         Returns:
             Number of rules indexed
         """
+        return self._index_documents(
+            [rule.to_index_document() for rule in rules], clear_existing
+        )
+
+    def _index_documents(self, index_docs: list[dict], clear_existing: bool) -> int:
+        """Encode and insert to_index_document()-shaped dicts."""
         if clear_existing:
             logger.info("Clearing existing collection")
             try:
                 self.client.delete_collection(self.collection_name)
                 self._collection = None
+                self._collection_changed()
             except Exception:
                 pass
 
-        # Prepare documents for indexing
+        ids, documents, metadatas = self._columns(index_docs)
+
+        # Encode in explicit batches, then insert precomputed embeddings
+        logger.info(f"Indexing {len(ids)} rules...")
+        embeddings = self._encode_documents(documents)
+        self.collection.add(
+            ids=ids,
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas
+        )
+        self._collection_changed()
+
+        logger.info(f"Successfully indexed {len(ids)} rules")
+        return len(ids)
+
+    @staticmethod
+    def _columns(index_docs: list[dict]) -> tuple[list[str], list[str], list[dict]]:
+        """Split index documents into ids, texts and metadata tagged with a content hash."""
         ids = []
         documents = []
         metadatas = []
 
-        for rule in rules:
-            index_doc = rule.to_index_document()
+        for index_doc in index_docs:
             ids.append(index_doc["id"])
             documents.append(index_doc["document"])
-            metadatas.append(index_doc["metadata"])
+            metadatas.append({
+                **index_doc["metadata"],
+                "content_sha256": _content_hash(index_doc["document"], index_doc["metadata"])
+            })
+        return ids, documents, metadatas
 
-        # Batch insert
-        logger.info(f"Indexing {len(rules)} rules...")
-        self.collection.add(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas
-        )
+    def _parse_index_documents(self, data: bytes, workers: Optional[int] = None) -> list[dict]:
+        """
+        Parse raw JSONL bytes straight into index documents (no Rule objects).
+
+        Large rulebooks are parsed in line chunks across worker processes.
+
+        Args:
+            data: Rulebook JSONL bytes
+            workers: Worker processes (default: settings.rag.index_workers)
+
+        Returns:
+            Index documents in file order
+        """
+        lines = data.splitlines()
+        workers = workers or settings.rag.index_workers
+
+        if workers <= 1 or len(lines) < _MIN_PARALLEL_LINES:
+            parsed = _parse_index_chunk(1, lines)
+        else:
+            size = -(-len(lines) // workers)
+            starts = range(0, len(lines), size)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunks = pool.map(
+                    _parse_index_chunk,
+                    [start + 1 for start in starts],
+                    [lines[start:start + size] for start in starts]
+                )
+                parsed = [item for chunk in chunks for item in chunk]
+
+        index_docs = []
+        for line_num, index_doc in parsed:
+            if index_doc:
+                index_docs.append(index_doc)
+            else:
+                logger.warning(f"Failed to parse rule at line {line_num}")
+        return index_docs
+
+    def _encode_documents(self, documents: list[str]):
+        """
+        Encode documents, reusing embeddings cached on disk by content hash.
+
+        Only documents whose (model, precision, text) hash is not cached are
+        sent to the encoder, so rebuilding an index from unchanged rules
+        skips both model loading and forward passes. Each embedding is one
+        file named by its hash, so a miss writes only the new entries.
+
+        Args:
+            documents: Texts to embed
 
-        logger.info(f"Successfully indexed {len(rules)} rules")
-        return len(rules)
+        Returns:
+            Normalized embeddings as a numpy array
+        """
+        cache_dir = settings.rag.embedding_cache_dir
+        if cache_dir is None:
+            return self._encode_uncached(documents)
+
+        cache_dir = Path(cache_dir)
+        keys = [self._embedding_key(document) for document in documents]
+        cache = {key: _load_cached_embedding(cache_dir, key) for key in dict.fromkeys(keys)}
+        missing = list(dict.fromkeys(
+            (key, document) for key, document in zip(keys, documents) if cache[key] is None
+        ))
+
+        if missing:
+            encoded = self._encode_uncached([document for _, document in missing])
+            for (key, _), embedding in zip(missing, encoded):
+                cache[key] = embedding
+                _store_cached_embedding(cache_dir, key, embedding)
+            _evict_embeddings(cache_dir, settings.rag.embedding_cache_max_entries)
+        logger.debug(f"Embedding cache: {len(documents) - len(missing)} hits, {len(missing)} encoded")
+
+        return np.stack([cache[key] for key in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+
+    def _embedding_key(self, document: str) -> str:
+        """Cache key of a document's embedding under the configured model and precision."""
+        payload = "\0".join((
+            self.embedding_model, settings.rag.embedding_backend, settings.rag.embedding_dtype, document
+        ))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _encode_uncached(self, documents: list[str]):
+        """Encode documents with one batched call on the shared encoder."""
+        function = self.embedding_function
+        # Chroma caches the SentenceTransformer per model name; reuse it.
+        # The ONNX function encodes in batches itself.
+        encoder = getattr(function, "_model", function)
+        return encoder.encode(
+            documents,
+            batch_size=settings.rag.embedding_batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
 
     def index_from_file(
         self,
         jsonl_path: str | Path = None,
-        clear_existing: bool = True
+        clear_existing: bool = True,
+        force: bool = False
     ) -> int:
         """
         Load and index rules from JSONL file.
 
+        Skips re-encoding when the collection was built from a rulebook
+        with the same SHA-256 and the same embedding model. Otherwise, with
+        the same model, only new or edited rules are re-embedded.
+
         Args:
             jsonl_path: Path to JSONL file (default: settings.rulebook_path)
-            clear_existing: Whether to clear existing index
+            clear_existing: Whether to replace the existing index contents
+            force: Rebuild the whole index even if rules are unchanged
 
         Returns:
             Number of rules indexed
         """
-        jsonl_path = jsonl_path or settings.rulebook_path
-        rules = self.load_rules_from_jsonl(jsonl_path)
-        return self.index_rules(rules, clear_existing)
+        jsonl_path = Path(jsonl_path or settings.rulebook_path)
+        logger.info(f"Loading rules from {jsonl_path}")
+        data = jsonl_path.read_bytes()
+        # Index-only flow: no Rule objects are needed
+        index_docs = self._parse_index_documents(data)
+
+        fingerprint = {
+            "rulebook_sha256": hashlib.sha256(data).hexdigest(),
+            "embedding_model": self.embedding_model,
+            "embedding_backend": settings.rag.embedding_backend,
+            "embedding_dtype": settings.rag.embedding_dtype,
+        }
+        stored = self._stored_metadata()
+        if not force and stored is not None and self._is_current(stored, fingerprint, len(index_docs)):
+            logger.info("Rulebook unchanged since last index, skipping re-encoding")
+            return len(index_docs)
+
+        if (
+            clear_existing and not force and stored is not None
+            and all(
+                stored["metadata"].get(k) == fingerprint[k]
+                for k in ("embedding_model", "embedding_backend", "embedding_dtype")
+            )
+        ):
+            # Same model, backend and precision: only new or edited rules need embedding
+            count = self._sync_documents(index_docs)
+        else:
+            count = self._index_documents(index_docs, clear_existing)
+
+        # Distance settings are fixed at creation and may not be re-sent
+        metadata = {
+            k: v for k, v in (self.collection.metadata or {}).items()
+            if not k.startswith("hnsw:")
+        }
+        self.collection.modify(metadata={**metadata, **fingerprint})
+        return count
+
+    def _stored_metadata(self) -> Optional[dict]:
+        """Metadata and size of the stored collection, read without loading the embedding model."""
+        try:
+            stored = self.client.get_collection(self.collection_name)
+        except Exception:
+            return None
+        return {"metadata": stored.metadata or {}, "count": stored.count()}
+
+    @staticmethod
+    def _is_current(stored: dict, fingerprint: dict, rule_count: int) -> bool:
+        """Check whether the stored collection already holds this rulebook's embeddings."""
+        return (
+            all(stored["metadata"].get(k) == v for k, v in fingerprint.items())
+            and stored["count"] == rule_count
+        )
+
+    def _sync_documents(self, index_docs: list[dict]) -> int:
+        """
+        Bring the collection in line with index_docs incrementally.
+
+        Rules whose content hash changed (or that are new) are re-embedded
+        and upserted; rules no longer in the rulebook are deleted.
+
+        Args:
+            index_docs: to_index_document()-shaped dicts for the full rulebook
+
+        Returns:
+            Number of rules in the rulebook
+        """
+        existing = self.collection.get(include=["metadatas"])
+        stored_hashes = {
+            rule_id: (metadata or {}).get("content_sha256")
+            for rule_id, metadata in zip(existing["ids"], existing["metadatas"] or [])
+        }
+
+        ids, documents, metadatas = self._columns(index_docs)
+        changed = [
+            i for i, metadata in enumerate(metadatas)
+            if stored_hashes.get(ids[i]) != metadata["content_sha256"]
+        ]
+        removed = stored_hashes.keys() - set(ids)
+
+        if removed:
+            self.collection.delete(ids=list(removed))
+        if changed:
+            changed_documents = [documents[i] for i in changed]
+            self.collection.upsert(
+                ids=[ids[i] for i in changed],
+                embeddings=self._encode_documents(changed_documents),
+                documents=changed_documents,
+                metadatas=[metadatas[i] for i in changed]
+            )
+        if removed or changed:
+            self._collection_changed()
+
+        logger.info(f"Re-embedded {len(changed)} changed rules, removed {len(removed)}")
+        return len(ids)
 
     def get_rule_by_id(self, rule_id: str) -> Optional[dict]:
         """
@@ -225,3 +509,105 @@ class RuleIndexer:
         except Exception as e:
             logger.error(f"Error getting stats: {e}")
             return {}
+
+
+def _embedding_device() -> str:
+    """Prefer CUDA for the local encoder when torch can see a GPU."""
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _with_precision(model_name: str, model, device: str):
+    """
+    Apply settings.rag.embedding_dtype to a sentence-transformers model:
+    float16 halves weights on CUDA, int8 dynamically quantizes the Linear
+    layers for CPU inference. Unsupported combinations keep float32.
+
+    The shared float32 model is never modified; the converted copy is
+    cached in _precision_models and reused by later indexers.
+    """
+    dtype = settings.rag.embedding_dtype
+    if dtype == "float16" and device != "cuda":
+        logger.warning("float16 embeddings need a CUDA device, keeping float32")
+        return model
+    if dtype == "int8" and device != "cpu":
+        logger.warning("int8 embeddings run on CPU only, keeping float32")
+        return model
+    if dtype not in ("float16", "int8"):
+        return model
+
+    key = (model_name, device, dtype)
+    with _precision_lock:
+        converted = _precision_models.get(key)
+        if converted is None:
+            if dtype == "float16":
+                converted = copy.deepcopy(model).half()
+            else:
+                import torch
+                converted = torch.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8, inplace=False
+                )
+            _precision_models[key] = converted
+    return converted
+
+
+def _load_cached_embedding(cache_dir: Path, key: str) -> Optional[np.ndarray]:
+    """A cached embedding, or None if absent or unreadable."""
+    path = cache_dir / f"{key}{_EMBEDDING_CACHE_SUFFIX}"
+    try:
+        return np.load(path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable embedding cache entry {path.name}: {e}")
+        return None
+
+
+def _store_cached_embedding(cache_dir: Path, key: str, embedding: np.ndarray):
+    """Write one embedding atomically, so readers never see a partial file."""
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.asarray(embedding))
+        os.replace(tmp, cache_dir / f"{key}{_EMBEDDING_CACHE_SUFFIX}")
+    except OSError as e:
+        logger.warning(f"Could not write embedding cache entry {key}: {e}")
+
+
+def _evict_embeddings(cache_dir: Path, max_entries: int):
+    """Delete the least recently written embeddings beyond max_entries."""
+    try:
+        entries = [
+            entry for entry in os.scandir(cache_dir)
+            if entry.name.endswith(_EMBEDDING_CACHE_SUFFIX)
+        ]
+    except OSError:
+        return
+    if len(entries) <= max_entries:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    logger.debug(f"Embedding cache: evicting {len(entries) - max_entries} entries")
+    for entry in entries[:len(entries) - max_entries]:
+        try:
+            os.unlink(entry.path)
+        except FileNotFoundError:
+            pass  # removed concurrently
+
+
+def _content_hash(document: str, metadata: dict) -> str:
+    """Hash of a rule's indexed text and metadata, for change detection."""
+    payload = json.dumps([document, metadata], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _parse_index_chunk(first_line_num: int, lines: list[bytes]) -> list[tuple[int, Optional[dict]]]:
+    """Parse a chunk of JSONL lines into (line number, index document or None), skipping blanks."""
+    return [
+        (line_num, Rule.index_document_from_jsonl_line(line))
+        for line_num, line in enumerate(lines, first_line_num)
+        if line.strip()
+    ]
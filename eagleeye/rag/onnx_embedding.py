@@ -0,0 +1,143 @@
+"""
+ONNX Embedding - onnxruntime-backed embedding function for rule indexing.
+"""
+
+import platform
+from pathlib import Path
+from typing import Optional
+from loguru import logger
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils.embedding_functions import register_embedding_function
+
+
+@register_embedding_function
+class OnnxEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    ChromaDB embedding function running the encoder on onnxruntime.
+
+    The model is exported to ONNX on first use (optionally with dynamic
+    int8 quantization) and cached under cache_dir. Embeddings use CLS
+    pooling plus L2 normalization, matching the bge sentence-transformers
+    configuration. Requires optimum[onnxruntime].
+    """
+
+    def __init__(self, model_name: str, quantize: bool = True, cache_dir: str = "./chroma_db/onnx"):
+        """
+        Initialize ONNX embedding function.
+
+        Args:
+            model_name: Hugging Face model name
+            quantize: Apply dynamic int8 quantization to the exported model
+            cache_dir: Directory for exported ONNX models
+        """
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.cache_dir = cache_dir
+
+        variant = "int8" if quantize else "fp32"
+        model_dir = Path(cache_dir) / f"{model_name.replace('/', '__')}-{variant}"
+
+        quantization_config = _quantization_config() if quantize else None
+        if quantize and quantization_config is None:
+            logger.warning(f"No int8 quantization config for {platform.machine()}, exporting fp32")
+            variant = "fp32"
+            model_dir = Path(cache_dir) / f"{model_name.replace('/', '__')}-{variant}"
+
+        if not model_dir.exists():
+            logger.info(f"Exporting {model_name} to ONNX ({variant}) at {model_dir}")
+            model = ORTModelForFeatureExtraction.from_pretrained(
+                model_name, export=True, provider="CPUExecutionProvider"
+            )
+            if quantization_config is not None:
+                from optimum.onnxruntime import ORTQuantizer
+
+                quantizer = ORTQuantizer.from_pretrained(model)
+                quantizer.quantize(save_dir=model_dir, quantization_config=quantization_config)
+            else:
+                model.save_pretrained(model_dir)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+
+        self._tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self._session = ORTModelForFeatureExtraction.from_pretrained(
+            model_dir, provider="CPUExecutionProvider"
+        )
+
+    def __call__(self, input: Documents) -> Embeddings:
+        """Embed documents for ChromaDB."""
+        return list(self.encode(list(input)))
+
+    def encode(self, documents: list[str], batch_size: int = 64, **kwargs) -> np.ndarray:
+        """
+        Encode documents in batches.
+
+        Args:
+            documents: Texts to embed
+            batch_size: Documents per forward pass
+
+        Returns:
+            L2-normalized float32 embeddings, one row per document
+        """
+        batches = []
+        for start in range(0, len(documents), batch_size):
+            inputs = self._tokenizer(
+                documents[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=512,
+                return_tensors="np"
+            )
+            hidden = self._session(**inputs).last_hidden_state
+            batches.append(np.asarray(hidden[:, 0], dtype=np.float32))
+
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        embeddings = np.concatenate(batches)
+        return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    @staticmethod
+    def name() -> str:
+        """Registry name ChromaDB stores with the collection."""
+        return "eagleeye_onnx"
+
+    def get_config(self) -> dict:
+        """Constructor arguments ChromaDB persists to rebuild this function."""
+        return {"model_name": self.model_name, "quantize": self.quantize, "cache_dir": self.cache_dir}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "OnnxEmbeddingFunction":
+        """Rebuild from a persisted config."""
+        return OnnxEmbeddingFunction(**config)
+
+
+def _quantization_config() -> Optional["QuantizationConfig"]:
+    """
+    Dynamic int8 quantization config for the host CPU, or None when the
+    architecture has no matching onnxruntime kernels.
+    """
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    machine = platform.machine().lower()
+    if machine in ("arm64", "aarch64"):
+        return AutoQuantizationConfig.arm64(is_static=False)
+    if machine in ("x86_64", "amd64", "x64", "i386", "i686"):
+        if "avx512_vnni" in _cpu_flags():
+            return AutoQuantizationConfig.avx512_vnni(is_static=False)
+        # avx2 kernels run on any modern x86 CPU
+        return AutoQuantizationConfig.avx2(is_static=False)
+    return None
+
+
+def _cpu_flags() -> set[str]:
+    """CPU feature flags from /proc/cpuinfo (empty where unavailable)."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.partition(":")[2].split())
+    except OSError:
+        pass
+    return set()
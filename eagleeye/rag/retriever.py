@@ -2,18 +2,33 @@
 Rule Retriever - Hybrid retrieval with semantic similarity and keyword boosting.
 """
 
+import asyncio
+import heapq
 import json
+import threading
+from collections import OrderedDict, defaultdict, deque
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
+import numpy as np
 from loguru import logger
 
-import sys
-sys.path.insert(0, str(__file__).rsplit("\\", 3)[0])
-
 from config.settings import settings
 from eagleeye.rag.indexer import RuleIndexer
 from eagleeye.models.rule import Rule
 
+# Recent query embeddings compared against for near-duplicate queries
+_RECENT_QUERIES = 64
+
+# Dimension-pruned scoring: embeddings are split into this many column
+# chunks, and only rulebooks at least this large use it (a single matrix
+# product is faster below that)
+_PRUNE_CHUNKS = 4
+_MIN_PRUNED_RULES = 4096
+
+# Reciprocal Rank Fusion damping constant: score = sum(weight / (k + rank))
+_RRF_K = 60
+
 
 class RuleRetriever:
     """
@@ -21,6 +36,19 @@ class RuleRetriever:
     Supports filtering by category and priority.
     """
 
+    # Parsed rulebook per resolved path, with the mtime it was read at;
+    # shared by all instances and replaced when the file changes
+    _rulebook_cache: dict[str, tuple[int, list[Rule]]] = {}
+    _rulebook_lock = threading.Lock()
+
+    # Raw semantic search hits [(rule_id, similarity)], shared by all instances:
+    # exact matches by (query, search key), plus recent query embeddings
+    _query_cache: OrderedDict[tuple, list[tuple[str, float]]] = OrderedDict()
+    _recent_queries: deque = deque(maxlen=_RECENT_QUERIES)
+    _query_lock = threading.Lock()
+    # Collection version the cached hits were computed against, per collection
+    _query_cache_versions: dict[tuple[str, str], int] = {}
+
     def __init__(
         self,
         indexer: RuleIndexer = None,
@@ -39,29 +67,142 @@ class RuleRetriever:
         self.similarity_threshold = similarity_threshold or settings.rag.similarity_threshold
         self.top_k = top_k or settings.rag.top_k
 
-        # Cache for loaded rules
-        self._rules_cache: dict[str, Rule] = {}
-
     def load_rules_to_cache(self, jsonl_path: str | Path = None):
-        """Load all rules into memory cache for quick access."""
-        jsonl_path = jsonl_path or settings.rulebook_path
-        rules = self.indexer.load_rules_from_jsonl(jsonl_path)
-
+        """
+        Load all rules into memory cache for quick access.
+        Parsed rulebooks are shared across retrievers in the process and
+        re-read only when the file changes; reloading the rulebook this
+        retriever last loaded, unchanged, keeps its derived views.
+        """
+        jsonl_path = Path(jsonl_path or settings.rulebook_path).resolve()
+        mtime = jsonl_path.stat().st_mtime_ns
+        key = (str(jsonl_path), mtime)
+        if self.__dict__.get("_loaded_rulebook") == key:
+            return
+
+        # Concurrent loads (e.g. the workflow warm-up) wait for the first one
+        with RuleRetriever._rulebook_lock:
+            cached_mtime, rules = RuleRetriever._rulebook_cache.get(str(jsonl_path), (None, None))
+            if cached_mtime != mtime:
+                rules = self.indexer.load_rules_from_jsonl(jsonl_path)
+                RuleRetriever._rulebook_cache[str(jsonl_path)] = (mtime, rules)
+                # Rulebook changed: cached search hits may name stale rules
+                with RuleRetriever._query_lock:
+                    RuleRetriever._query_cache.clear()
+                    RuleRetriever._recent_queries.clear()
+
+        # Fill rules_cache directly (not through the property, which would
+        # load the default rulebook first); derived views rebuild on next use
+        rules_cache = self.__dict__.setdefault("rules_cache", {})
         for rule in rules:
-            self._rules_cache[rule.rule_id] = rule
+            rules_cache[rule.rule_id] = rule
+        for name in self._DERIVED_VIEWS:
+            self.__dict__.pop(name, None)
+        self.__dict__["_loaded_rulebook"] = key
 
         logger.info(f"Loaded {len(rules)} rules to cache")
 
+    @cached_property
+    def rules_cache(self) -> dict[str, Rule]:
+        """Rules by ID; the default rulebook is loaded on first access."""
+        self.load_rules_to_cache()
+        return self.__dict__["rules_cache"]
+
+    # Views over rules_cache below are computed once per load. Row i of each
+    # per-rule array describes _rule_list[i]; keyword postings hold row numbers.
+    _DERIVED_VIEWS = (
+        "_rule_list", "_rule_categories", "_rule_priorities",
+        "_keyword_index", "_rule_embeddings", "_rule_embedding_chunks",
+        "_by_category", "_by_priority"
+    )
+
+    @cached_property
+    def _rule_list(self) -> list[Rule]:
+        """Cached rules in rulebook order."""
+        return list(self.rules_cache.values())
+
+    @cached_property
+    def _rule_categories(self) -> np.ndarray:
+        """Category per rule, for filter masks."""
+        return np.array([rule.category for rule in self._rule_list], dtype=str)
+
+    @cached_property
+    def _rule_priorities(self) -> np.ndarray:
+        """Priority per rule, for filter masks."""
+        return np.array([rule.priority for rule in self._rule_list], dtype=str)
+
+    @cached_property
+    def _keyword_index(self) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """
+        Inverted index from trigger keyword to the rows of the rules that
+        list it, plus each rule's keyword count, for Jaccard scoring.
+        """
+        postings: dict[str, list[int]] = defaultdict(list)
+        row_sizes = np.zeros(len(self._rule_list), dtype=np.float64)
+        for row, rule in enumerate(self._rule_list):
+            keywords = set(rule.trigger_keywords)
+            row_sizes[row] = len(keywords)
+            for kw in keywords:
+                postings[kw].append(row)
+
+        return {kw: np.array(rows, dtype=np.intp) for kw, rows in postings.items()}, row_sizes
+
+    @cached_property
+    def _rule_embeddings(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        L2-normalized indexed embedding per rule (fetched from the collection
+        once), plus a mask of the rules that are present in the index.
+        """
+        # Snapshot version; _search_uncached refetches once the collection changes
+        self.__dict__["_embeddings_version"] = self.indexer.collection_version
+        row_by_id = {rule.rule_id: i for i, rule in enumerate(self._rule_list)}
+        stored = self.indexer.collection.get(ids=list(row_by_id), include=["embeddings"])
+
+        vectors = np.asarray(stored["embeddings"], dtype=np.float32)
+        dim = vectors.shape[1] if vectors.ndim == 2 else 0
+        embeddings = np.zeros((len(self._rule_list), dim), dtype=np.float32)
+        indexed = np.zeros(len(self._rule_list), dtype=bool)
+        if dim:
+            rows = [row_by_id[rule_id] for rule_id in stored["ids"]]
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            embeddings[rows] = vectors / norms
+            indexed[rows] = True
+        return embeddings, indexed
+
+    @cached_property
+    def _rule_embedding_chunks(self) -> tuple[list[np.ndarray], np.ndarray]:
+        """
+        Rule embeddings split into _PRUNE_CHUNKS contiguous column blocks, plus
+        tail_norms[m, i]: the norm of rule i's dimensions after block m.
+        """
+        embeddings, _ = self._rule_embeddings
+        bounds = np.linspace(0, embeddings.shape[1], _PRUNE_CHUNKS + 1).astype(int)
+        chunks = [
+            np.ascontiguousarray(embeddings[:, lo:hi])
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+        ]
+        return chunks, _tail_norms(chunks)
+
+    @cached_property
+    def _by_category(self) -> dict[str, list[Rule]]:
+        """Cached rules grouped by category, for O(result) lookups."""
+        by_category = defaultdict(list)
+        for rule in self._rule_list:
+            by_category[rule.category].append(rule)
+        return dict(by_category)
+
+    @cached_property
+    def _by_priority(self) -> dict[str, list[Rule]]:
+        """Cached rules grouped by priority, for O(result) lookups."""
+        by_priority = defaultdict(list)
+        for rule in self._rule_list:
+            by_priority[rule.priority].append(rule)
+        return dict(by_priority)
+
     def get_rule(self, rule_id: str) -> Optional[Rule]:
         """Get rule by ID from cache or file."""
-        if rule_id in self._rules_cache:
-            return self._rules_cache[rule_id]
-
-        # Try to load from file if not in cache
-        if not self._rules_cache:
-            self.load_rules_to_cache()
-
-        return self._rules_cache.get(rule_id)
+        return self.rules_cache.get(rule_id)
 
     def retrieve_by_query(
         self,
@@ -84,53 +225,236 @@ class RuleRetriever:
         """
         top_k = top_k or self.top_k
 
-        # Build where clause for filtering
-        where_clause = None
-        if category_filter or priority_filter:
-            conditions = []
-            if category_filter:
-                conditions.append({"category": {"$in": category_filter}})
-            if priority_filter:
-                conditions.append({"priority": {"$in": priority_filter}})
-
-            if len(conditions) == 1:
-                where_clause = conditions[0]
-            else:
-                where_clause = {"$and": conditions}
-
-        # Query ChromaDB
-        try:
-            results = self.indexer.collection.query(
-                query_texts=[query],
-                n_results=top_k * 2,  # Get more to filter by threshold
-                where=where_clause,
-                include=["documents", "metadatas", "distances"]
-            )
-        except Exception as e:
-            logger.error(f"Query error: {e}")
-            return []
+        # Get more to filter by threshold
+        hits = self._search_many([query], top_k * 2, category_filter, priority_filter)[0]
+        return self._rules_for_hits(hits, top_k)
+
+    def _filter_mask(
+        self,
+        category_filter: list[str] = None,
+        priority_filter: list[str] = None
+    ) -> Optional[np.ndarray]:
+        """Boolean mask over _rule_list for category/priority filters (None if unfiltered)."""
+        mask = None
+        if category_filter:
+            mask = np.isin(self._rule_categories, category_filter)
+        if priority_filter:
+            priority_mask = np.isin(self._rule_priorities, priority_filter)
+            mask = priority_mask if mask is None else mask & priority_mask
+        return mask
 
-        # Process results
+    def _rules_for_hits(self, hits: list[tuple[str, float]], top_k: int) -> list[tuple[Rule, float]]:
+        """Resolve search hits above the similarity threshold to rules, best first."""
         retrieved = []
-        if results["ids"] and results["ids"][0]:
-            for i, rule_id in enumerate(results["ids"][0]):
-                # Convert distance to similarity (cosine distance -> similarity)
-                distance = results["distances"][0][i] if results["distances"] else 0
-                similarity = 1 - distance
+        for rule_id, similarity in hits:
+            if similarity >= self.similarity_threshold:
+                rule = self.get_rule(rule_id)
+                if rule:
+                    retrieved.append((rule, similarity))
 
-                if similarity >= self.similarity_threshold:
-                    rule = self.get_rule(rule_id)
-                    if rule:
-                        retrieved.append((rule, similarity))
+        # Best top_k by similarity
+        return heapq.nlargest(top_k, retrieved, key=lambda x: x[1])
 
-        # Sort by similarity and limit
-        retrieved.sort(key=lambda x: x[1], reverse=True)
-        return retrieved[:top_k]
+    def _search_many(
+        self,
+        queries: list[str],
+        n_results: int,
+        category_filter: list[str] = None,
+        priority_filter: list[str] = None
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Semantic search hits for a batch of queries, served from cache when possible.
+
+        Exact repeats hit the LRU cache. The remaining queries are embedded
+        in one call; those with a recent query at least query_cache_similarity
+        similar (same search parameters) reuse its hits, and the rest are
+        scored against the rule embeddings in a single matrix product.
+
+        Args:
+            queries: Search query texts
+            n_results: Number of hits to fetch per query
+            category_filter: Only return rules in these categories
+            priority_filter: Only return rules with these priorities
+
+        Returns:
+            One list of (rule_id, similarity) tuples per query, best first
+        """
+        search_key = (
+            self.indexer.persist_directory,
+            self.indexer.collection_name,
+            n_results,
+            json.dumps([sorted(category_filter or ()), sorted(priority_filter or ())])
+        )
+        cache = RuleRetriever._query_cache
+        found: dict[str, list[tuple[str, float]]] = {}
+        with RuleRetriever._query_lock:
+            self._drop_stale_queries()
+            for query in queries:
+                key = (query, *search_key)
+                hits = cache.get(key)
+                if hits is not None:
+                    cache.move_to_end(key)
+                    found[query] = hits
+
+        misses = list(dict.fromkeys(query for query in queries if query not in found))
+        if misses:
+            try:
+                found.update(self._search_uncached(misses, search_key, category_filter, priority_filter))
+            except Exception as e:
+                logger.error(f"Query error: {e}")
+                return [found.get(query, []) for query in queries]
+
+            with RuleRetriever._query_lock:
+                for query in misses:
+                    cache[(query, *search_key)] = found[query]
+                while len(cache) > settings.rag.query_cache_size:
+                    cache.popitem(last=False)
+
+        return [found[query] for query in queries]
+
+    def _drop_stale_queries(self):
+        """
+        Clear cached hits for this retriever's collection if it was re-indexed
+        since they were computed. Caller holds _query_lock.
+        """
+        collection = (self.indexer.persist_directory, self.indexer.collection_name)
+        version = self.indexer.collection_version
+        seen = RuleRetriever._query_cache_versions.setdefault(collection, version)
+        if seen == version:
+            return
+
+        cache = RuleRetriever._query_cache
+        for key in [key for key in cache if key[1:3] == collection]:
+            del cache[key]
+        recent = [entry for entry in RuleRetriever._recent_queries if entry[0][:2] != collection]
+        RuleRetriever._recent_queries.clear()
+        RuleRetriever._recent_queries.extend(recent)
+        RuleRetriever._query_cache_versions[collection] = version
+
+    def _search_uncached(
+        self,
+        queries: list[str],
+        search_key: tuple,
+        category_filter: list[str] = None,
+        priority_filter: list[str] = None
+    ) -> dict[str, list[tuple[str, float]]]:
+        """Embed queries once, reuse near-duplicate hits, and score the rest against every rule."""
+        embeddings = np.asarray(self.indexer.embedding_function(queries), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        embeddings /= norms
+
+        found = {}
+        pending = []
+        for query, embedding in zip(queries, embeddings):
+            hits = self._similar_query_hits(search_key, embedding)
+            if hits is None:
+                pending.append((query, embedding))
+            else:
+                found[query] = hits
+        if not pending:
+            return found
+
+        version = self.indexer.collection_version
+        if self.__dict__.get("_embeddings_version", version) != version:
+            # Re-indexed since the snapshot: upserted or deleted rules must not be scored stale
+            self.__dict__.pop("_rule_embeddings", None)
+            self.__dict__.pop("_rule_embedding_chunks", None)
+
+        # Exact cosine similarity: one [rules, dim] @ [dim, queries] product.
+        # For a rulebook-sized corpus this beats an ANN index round trip.
+        rule_embeddings, indexed = self._rule_embeddings
+        allowed = indexed
+        mask = self._filter_mask(category_filter, priority_filter)
+        if mask is not None:
+            allowed = allowed & mask
+        candidates = np.flatnonzero(allowed)
+
+        n_results = min(search_key[2], len(candidates))
+        if len(candidates) >= _MIN_PRUNED_RULES:
+            ranked = [self._pruned_scores(candidates, embedding, n_results) for _, embedding in pending]
+        else:
+            scores = rule_embeddings[candidates] @ np.stack([embedding for _, embedding in pending]).T
+            ranked = [(candidates, scores[:, column]) for column in range(len(pending))]
+
+        recent = []
+        for (query, embedding), (rows, scores) in zip(pending, ranked):
+            found[query] = self._top_hits(rows, scores, n_results)
+            recent.append((search_key, embedding, found[query]))
+
+        with RuleRetriever._query_lock:
+            RuleRetriever._recent_queries.extend(recent)
+        return found
+
+    def _pruned_scores(
+        self,
+        candidates: np.ndarray,
+        embedding: np.ndarray,
+        n_results: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Exact similarities of the rules that can still reach the top n_results.
+
+        Dot products are accumulated one column block at a time. After each
+        block, Cauchy-Schwarz bounds the rest of a rule's score by
+        tail_norm(rule) * tail_norm(query); rules whose upper bound falls
+        below the n-th best lower bound cannot make the top n and are
+        dropped before their remaining dimensions are read.
+
+        Returns:
+            (surviving candidate rows, their full similarities)
+        """
+        chunks, tail_norms = self._rule_embedding_chunks
+        query_chunks = np.split(embedding, np.cumsum([chunk.shape[1] for chunk in chunks])[:-1])
+        query_tail_norms = _tail_norms([chunk[np.newaxis] for chunk in query_chunks])[:, 0]
+
+        alive = candidates
+        partial = np.zeros(len(alive), dtype=np.float32)
+        for m, (chunk, query_chunk) in enumerate(zip(chunks, query_chunks)):
+            partial += chunk[alive] @ query_chunk
+            if m == len(chunks) - 1 or len(alive) <= n_results:
+                continue
+            slack = tail_norms[m, alive] * query_tail_norms[m]
+            lower = partial - slack
+            threshold = np.partition(lower, len(lower) - n_results)[len(lower) - n_results]
+            keep = partial + slack >= threshold
+            alive, partial = alive[keep], partial[keep]
+
+        return alive, partial
+
+    def _top_hits(self, candidates: np.ndarray, scores: np.ndarray, n_results: int) -> list[tuple[str, float]]:
+        """Best n_results (rule_id, similarity) among candidate rows, best first."""
+        if n_results <= 0:
+            return []
+        best = np.argpartition(-scores, n_results - 1)[:n_results]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self._rule_list[candidates[i]].rule_id, float(scores[i])) for i in best]
+
+    @staticmethod
+    def _similar_query_hits(search_key: tuple, embedding: np.ndarray) -> Optional[list[tuple[str, float]]]:
+        """Hits of the most similar recent query with the same search key, if similar enough."""
+        if settings.rag.query_cache_similarity > 1:
+            return None
+        with RuleRetriever._query_lock:
+            candidates = [
+                (recent, hits) for key, recent, hits in RuleRetriever._recent_queries
+                if key == search_key
+            ]
+        if not candidates:
+            return None
+
+        similarities = np.stack([recent for recent, _ in candidates]) @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] >= settings.rag.query_cache_similarity:
+            return candidates[best][1]
+        return None
 
     def retrieve_by_keywords(
         self,
         keywords: list[str],
-        top_k: int = None
+        top_k: int = None,
+        category_filter: list[str] = None,
+        priority_filter: list[str] = None
     ) -> list[tuple[Rule, float]]:
         """
         Retrieve rules by keyword matching.
@@ -138,32 +462,33 @@ class RuleRetriever:
         Args:
             keywords: List of keywords to match
             top_k: Maximum results
+            category_filter: Only score rules in these categories
+            priority_filter: Only score rules with these priorities
 
         Returns:
             List of (Rule, match_score) tuples
         """
         top_k = top_k or self.top_k
+        postings, row_sizes = self._keyword_index
+
+        # Only rules sharing a keyword with the query are touched:
+        # |R & Q| = occurrences of the rule across the query's posting
+        # lists, |R | Q| = |R| + |Q| - |R & Q|
+        query_keywords = set(keywords)
+        hits = [postings[kw] for kw in query_keywords if kw in postings]
+        if not hits:
+            return []
 
-        # Ensure rules are loaded
-        if not self._rules_cache:
-            self.load_rules_to_cache()
-
-        # Score rules by keyword overlap
-        scored_rules = []
-        for rule in self._rules_cache.values():
-            rule_keywords = set(rule.trigger_keywords)
-            query_keywords = set(keywords)
-
-            # Calculate Jaccard similarity
-            intersection = len(rule_keywords & query_keywords)
-            if intersection > 0:
-                union = len(rule_keywords | query_keywords)
-                score = intersection / union
-                scored_rules.append((rule, score))
+        rows, counts = np.unique(np.concatenate(hits), return_counts=True)
+        mask = self._filter_mask(category_filter, priority_filter)
+        if mask is not None:
+            keep = mask[rows]
+            rows, counts = rows[keep], counts[keep]
+        scores = counts / (row_sizes[rows] + len(query_keywords) - counts)
 
-        # Sort by score
-        scored_rules.sort(key=lambda x: x[1], reverse=True)
-        return scored_rules[:top_k]
+        # Top matches only; rows are in rulebook order, which nlargest keeps among equal scores
+        best = heapq.nlargest(top_k, range(len(rows)), key=scores.__getitem__)
+        return [(self._rule_list[rows[i]], float(scores[i])) for i in best]
 
     def retrieve_hybrid(
         self,
@@ -176,19 +501,20 @@ class RuleRetriever:
         priority_filter: list[str] = None
     ) -> list[tuple[Rule, float]]:
         """
-        Hybrid retrieval combining semantic similarity and keyword matching.
+        Hybrid retrieval combining semantic similarity and keyword matching
+        with Reciprocal Rank Fusion.
 
         Args:
             query: Search query text
             keywords: Optional additional keywords
             top_k: Maximum results
-            semantic_weight: Weight for semantic similarity
-            keyword_weight: Weight for keyword matching
+            semantic_weight: Weight for semantic ranks
+            keyword_weight: Weight for keyword ranks
             category_filter: Filter by categories
             priority_filter: Filter by priorities
 
         Returns:
-            List of (Rule, combined_score) tuples
+            List of (Rule, fused_score) tuples
         """
         top_k = top_k or self.top_k
 
@@ -202,35 +528,88 @@ class RuleRetriever:
         # Get keyword results if keywords provided
         keyword_results = []
         if keywords:
-            keyword_results = self.retrieve_by_keywords(keywords, top_k=top_k * 2)
+            keyword_results = self.retrieve_by_keywords(
+                keywords, top_k=top_k * 2,
+                category_filter=category_filter,
+                priority_filter=priority_filter
+            )
 
-        # Combine scores
-        combined_scores: dict[str, tuple[Rule, float]] = {}
+        return self._fuse_ranks(
+            semantic_results, keyword_results, semantic_weight, keyword_weight, top_k
+        )
 
-        for rule, score in semantic_results:
-            combined_scores[rule.rule_id] = (rule, score * semantic_weight)
+    async def aretrieve_hybrid(
+        self,
+        query: str,
+        keywords: list[str] = None,
+        top_k: int = None,
+        semantic_weight: float = 0.7,
+        keyword_weight: float = 0.3,
+        category_filter: list[str] = None,
+        priority_filter: list[str] = None
+    ) -> list[tuple[Rule, float]]:
+        """
+        Async retrieve_hybrid: the semantic search (query embedding) and the
+        keyword scoring are independent, so they run concurrently in worker
+        threads instead of back to back.
 
-        for rule, score in keyword_results:
-            if rule.rule_id in combined_scores:
-                existing_rule, existing_score = combined_scores[rule.rule_id]
-                combined_scores[rule.rule_id] = (
-                    existing_rule,
-                    existing_score + score * keyword_weight
-                )
-            else:
-                combined_scores[rule.rule_id] = (rule, score * keyword_weight)
+        Args:
+            query: Search query text
+            keywords: Optional additional keywords
+            top_k: Maximum results
+            semantic_weight: Weight for semantic ranks
+            keyword_weight: Weight for keyword ranks
+            category_filter: Filter by categories
+            priority_filter: Filter by priorities
 
-        # Sort and filter
-        results = list(combined_scores.values())
-        results.sort(key=lambda x: x[1], reverse=True)
+        Returns:
+            List of (Rule, fused_score) tuples
+        """
+        top_k = top_k or self.top_k
 
-        # Apply filters if not already done in semantic search
-        if category_filter:
-            results = [(r, s) for r, s in results if r.category in category_filter]
-        if priority_filter:
-            results = [(r, s) for r, s in results if r.priority in priority_filter]
+        searches = [
+            asyncio.to_thread(
+                self.retrieve_by_query, query, top_k * 2, category_filter, priority_filter
+            )
+        ]
+        if keywords:
+            searches.append(asyncio.to_thread(
+                self.retrieve_by_keywords, keywords, top_k * 2, category_filter, priority_filter
+            ))
+        semantic_results, *rest = await asyncio.gather(*searches)
+        keyword_results = rest[0] if rest else []
+
+        return self._fuse_ranks(
+            semantic_results, keyword_results, semantic_weight, keyword_weight, top_k
+        )
+
+    @staticmethod
+    def _fuse_ranks(
+        semantic_results: list[tuple[Rule, float]],
+        keyword_results: list[tuple[Rule, float]],
+        semantic_weight: float,
+        keyword_weight: float,
+        top_k: int
+    ) -> list[tuple[Rule, float]]:
+        """
+        Reciprocal Rank Fusion of ranked semantic and keyword results.
+
+        Each list contributes weight / (_RRF_K + rank) per rule, so cosine
+        similarity and Jaccard scores never need to share a scale.
+
+        Returns:
+            Top top_k (Rule, fused_score) tuples, best first
+        """
+        fused: dict[str, float] = defaultdict(float)
+        rule_by_id: dict[str, Rule] = {}
 
-        return results[:top_k]
+        for results, weight in ((semantic_results, semantic_weight), (keyword_results, keyword_weight)):
+            for rank, (rule, _) in enumerate(results):
+                fused[rule.rule_id] += weight / (_RRF_K + rank)
+                rule_by_id[rule.rule_id] = rule
+
+        best = heapq.nlargest(top_k, fused.items(), key=lambda x: x[1])
+        return [(rule_by_id[rule_id], score) for rule_id, score in best]
 
     def retrieve_for_document(
         self,
@@ -249,37 +628,65 @@ class RuleRetriever:
         Returns:
             List of (Rule, relevance_score) tuples
         """
+        return self.retrieve_for_documents(
+            [document_text], [extracted_keywords], top_k=top_k
+        )[0]
+
+    def retrieve_for_documents(
+        self,
+        texts: list[str],
+        extracted_keywords_list: list[list[str]] = None,
+        top_k: int = None
+    ) -> list[list[tuple[Rule, float]]]:
+        """
+        Retrieve relevant rules for several documents with one batched search.
+
+        Equivalent to calling retrieve_for_document per document, but all
+        queries are embedded together and sent to ChromaDB in one query.
+
+        Args:
+            texts: Document text contents
+            extracted_keywords_list: Keywords extracted from each document
+            top_k: Maximum results per document
+
+        Returns:
+            One list of (Rule, relevance_score) tuples per document
+        """
+        top_k = top_k or self.top_k
+        extracted_keywords_list = extracted_keywords_list or [None] * len(texts)
+
         # Use first 1000 chars as query to avoid token limits
-        query_text = document_text[:1000]
+        queries = [text[:1000] for text in texts]
 
-        return self.retrieve_hybrid(
-            query=query_text,
-            keywords=extracted_keywords,
-            top_k=top_k
-        )
+        # Same candidate depth as retrieve_hybrid(top_k) -> retrieve_by_query(top_k * 2)
+        hits_per_query = self._search_many(queries, top_k * 4)
+
+        results = []
+        for hits, keywords in zip(hits_per_query, extracted_keywords_list):
+            semantic_results = self._rules_for_hits(hits, top_k * 2)
+            keyword_results = []
+            if keywords:
+                keyword_results = self.retrieve_by_keywords(keywords, top_k=top_k * 2)
+
+            results.append(self._fuse_ranks(semantic_results, keyword_results, 0.7, 0.3, top_k))
+
+        return results
 
     def retrieve_all_rules(self) -> list[Rule]:
         """Get all rules for exhaustive checking."""
-        if not self._rules_cache:
-            self.load_rules_to_cache()
-        return list(self._rules_cache.values())
+        return list(self._rule_list)
 
     def retrieve_by_category(self, category: str) -> list[Rule]:
         """Get all rules in a specific category."""
-        if not self._rules_cache:
-            self.load_rules_to_cache()
-
-        return [
-            rule for rule in self._rules_cache.values()
-            if rule.category == category
-        ]
+        return list(self._by_category.get(category, ()))
 
     def retrieve_critical_rules(self) -> list[Rule]:
         """Get all critical priority rules."""
-        if not self._rules_cache:
-            self.load_rules_to_cache()
+        return list(self._by_priority.get("Critical", ()))
 
-        return [
-            rule for rule in self._rules_cache.values()
-            if rule.priority == "Critical"
-        ]
+
+def _tail_norms(chunks: list[np.ndarray]) -> np.ndarray:
+    """tail[m, i]: norm of row i across the column blocks after block m."""
+    squared = np.stack([np.einsum("ij,ij->i", chunk, chunk) for chunk in chunks])
+    tails = np.cumsum(squared[::-1], axis=0)[::-1]
+    return np.sqrt(np.vstack([tails[1:], np.zeros((1, squared.shape[1]), dtype=squared.dtype)]))
@@ -2,18 +2,77 @@
 PDF Parser - Dual-track parsing with pdfplumber and OCR fallback.
 """
 
+import functools
+import hashlib
+import io
+import os
+import pickle
+import re
+import tempfile
 from typing import Optional
 from pathlib import Path
 from loguru import logger
 import pdfplumber
 
-import sys
-sys.path.insert(0, str(__file__).rsplit("\\", 3)[0])
-
 from config.settings import settings
 from eagleeye.tools.ocr_engine import OCREngine
 from eagleeye.models.document import Document, TableData, FinancialData
 
+# Map common table row labels to fields; when a label contains several
+# patterns, the first one listed wins
+_TABLE_FIELDS = {
+    "货币资金": "货币资金",
+    "应收账款": "应收账款",
+    "其他应收款": "其他应收款",
+    "预付账款": "预付账款",
+    "存货": "存货",
+    "在建工程": "在建工程",
+    "固定资产": "固定资产",
+    "无形资产": "无形资产",
+    "资产总计": "资产总额",
+    "资产合计": "资产总额",
+    "短期借款": "短期借款",
+    "长期借款": "长期借款",
+    "应付债券": "应付债券",
+    "一年内到期的非流动负债": "一年内到期的非流动负债",
+    "其他应付款": "其他应付款",
+    "递延收益": "递延收益_期末",
+    "所有者权益合计": "净资产",
+    "净资产": "净资产",
+    "营业收入": "营业收入",
+    "营业成本": "营业成本",
+    "财务费用": "财务费用_利息支出",
+    "政府补助": "营业外收入_政府补助",
+    "利润总额": "利润总额",
+    "净利润": "净利润",
+    "经营活动产生的现金流量净额": "经营活动现金流量净额",
+    "投资活动产生的现金流量净额": "投资活动现金流出",
+}
+
+# Financial values quoted in running text, one named group per field, so a
+# single pass over the document finds every field
+_TEXT_PATTERN = re.compile(
+    r"货币资金[：:\s]*(?P<cash>[0-9,.]+)\s*(?:万|元|亿)?"
+    r"|资产负债率[：:\s]*(?P<debt_ratio>[0-9.]+)\s*%?"
+    r"|净资产收益率[：:\s]*(?P<roe>[0-9.]+)\s*%?"
+    r"|存货周转率[：:\s]*(?P<inventory_turnover>[0-9.]+)"
+)
+_TEXT_FIELDS = {
+    "cash": "货币资金",
+    "debt_ratio": "资产负债率",
+    "roe": "净资产收益率_ROE",
+    "inventory_turnover": "存货周转率",
+}
+
+# Trailing Chinese units in table values
+_UNIT_MULTIPLIERS = {"万": 1e4, "亿": 1e8}
+
+# Bump when parsing output changes, so stale cached documents are ignored
+_PARSE_CACHE_VERSION = 2
+
+# Read size when hashing PDFs for the parse cache key
+_HASH_BLOCK_BYTES = 1 << 20
+
 
 class PDFParser:
     """
@@ -26,7 +85,11 @@ class PDFParser:
         text_density_threshold: int = None,
         ocr_languages: list[str] = None,
         ocr_gpu: bool = None,
-        dpi: int = None
+        dpi: int = None,
+        cache_dir: str | Path = None,
+        ocr_scale: float = None,
+        ocr_grayscale: bool = None,
+        page_batch_size: int = None
     ):
         """
         Initialize PDF parser.
@@ -34,13 +97,23 @@ class PDFParser:
         Args:
             text_density_threshold: Chars per page to consider digital
             ocr_languages: Languages for OCR
-            ocr_gpu: Use GPU for OCR
+            ocr_gpu: Use GPU for OCR (default: settings, None autodetects)
             dpi: DPI for PDF to image conversion
+            cache_dir: Directory for parsed documents (default: settings.pdf.cache_dir)
+            ocr_scale: Render scale applied to dpi for OCR pages
+            ocr_grayscale: Render OCR pages in grayscale
+            page_batch_size: Pages pdfplumber opens at a time for digital PDFs;
+                OCR renders all pages to disk first (default: settings.pdf.page_batch_size)
         """
         self.text_density_threshold = text_density_threshold or settings.pdf.text_density_threshold
         self.ocr_languages = ocr_languages or settings.pdf.ocr_languages
         self.ocr_gpu = ocr_gpu if ocr_gpu is not None else settings.pdf.ocr_gpu
         self.dpi = dpi or settings.pdf.dpi
+        self.ocr_scale = ocr_scale or settings.pdf.ocr_scale
+        self.ocr_grayscale = ocr_grayscale if ocr_grayscale is not None else settings.pdf.ocr_grayscale
+        self.page_batch_size = max(1, page_batch_size or settings.pdf.page_batch_size)
+        cache_dir = cache_dir or settings.pdf.cache_dir
+        self.cache_dir = Path(cache_dir) if cache_dir else None
 
         self._ocr_engine: Optional[OCREngine] = None
 
@@ -54,12 +127,17 @@ class PDFParser:
             )
         return self._ocr_engine
 
-    def parse(self, pdf_path: str | Path) -> Document:
+    def parse(self, pdf_path: str | Path, keep_raw_tables: bool = False, use_cache: bool = True) -> Document:
         """
         Parse a PDF file and extract content.
 
+        Parsed documents are cached on disk by file content, so parsing the
+        same unchanged PDF again skips pdfplumber and OCR entirely.
+
         Args:
             pdf_path: Path to PDF file
+            keep_raw_tables: Keep each table's str() form in TableData.raw_text
+            use_cache: Read and write the parsed-document cache
 
         Returns:
             Parsed Document object
@@ -67,15 +145,74 @@ class PDFParser:
         pdf_path = Path(pdf_path)
         logger.info(f"Parsing PDF: {pdf_path.name}")
 
+        cache_file = self._cache_file(pdf_path, keep_raw_tables) if use_cache and self.cache_dir else None
+        if cache_file is not None:
+            doc = self._load_cached(cache_file)
+            if doc is not None:
+                logger.info(f"Using cached parse of {pdf_path.name}")
+                return doc
+
         # Try digital extraction first
         is_digital, total_pages, sample_text = self._detect_pdf_type(pdf_path)
 
         if is_digital:
             logger.info("Detected digital PDF, using pdfplumber")
-            return self._parse_digital(pdf_path, total_pages)
+            doc = self._parse_digital(pdf_path, total_pages, keep_raw_tables)
         else:
             logger.info("Detected scanned PDF, using OCR")
-            return self._parse_scanned(pdf_path, total_pages)
+            try:
+                doc = self._ocr_document(pdf_path, total_pages)
+            except Exception as e:
+                # Transient OCR failures must not be cached as an empty document
+                logger.error(f"OCR parsing error: {e}")
+                return self._scanned_document(pdf_path, total_pages, [])
+
+        if cache_file is not None and doc.raw_text.strip():
+            self._store_cached(cache_file, doc)
+        return doc
+
+    def _cache_file(self, pdf_path: Path, keep_raw_tables: bool) -> Path:
+        """
+        Cache file for a PDF: keyed on a hash of the full file content, its
+        path (stored in the Document), and the options that change parsing output.
+        """
+        pdf_path = pdf_path.resolve()
+        key = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK_BYTES), b""):
+                key.update(block)
+
+        key.update(repr((
+            _PARSE_CACHE_VERSION, str(pdf_path),
+            self.text_density_threshold, self.ocr_languages, self.dpi,
+            self.ocr_scale, self.ocr_grayscale, keep_raw_tables
+        )).encode("utf-8"))
+        return self.cache_dir / f"{key.hexdigest()}.pkl"
+
+    @staticmethod
+    def _load_cached(cache_file: Path) -> Optional[Document]:
+        """Load a cached document, or None if missing or unreadable."""
+        try:
+            with open(cache_file, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable parse cache {cache_file.name}: {e}")
+            return None
+
+    @staticmethod
+    def _store_cached(cache_file: Path, doc: Document):
+        """Write a parsed document to the cache atomically."""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_file, "wb") as f:
+                pickle.dump(doc, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+            _evict_cached_documents(cache_file.parent, settings.pdf.cache_max_entries)
+        except Exception as e:
+            logger.warning(f"Could not write parse cache: {e}")
 
     def _detect_pdf_type(self, pdf_path: Path) -> tuple[bool, int, str]:
         """
@@ -104,71 +241,108 @@ class PDFParser:
 
             return is_digital, total_pages, sample_text
 
-    def _parse_digital(self, pdf_path: Path, total_pages: int) -> Document:
-        """Parse digital PDF using pdfplumber."""
-        all_text = []
-        all_tables = []
-
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                # Extract text
-                text = page.extract_text() or ""
-                all_text.append(text)
-
-                # Extract tables
-                tables = page.extract_tables()
-                for table_idx, table in enumerate(tables):
-                    if table and len(table) > 0:
-                        # First row as headers if it looks like headers
-                        headers = table[0] if table else []
-                        rows = table[1:] if len(table) > 1 else []
-
-                        table_data = TableData(
-                            page_number=page_num,
-                            table_index=table_idx,
-                            headers=[str(h) if h else "" for h in headers],
-                            rows=[[str(c) if c else "" for c in row] for row in rows],
-                            raw_text=str(table)
-                        )
-                        all_tables.append(table_data)
+    def _parse_digital(self, pdf_path: Path, total_pages: int, keep_raw_tables: bool = False) -> Document:
+        """
+        Parse digital PDF using pdfplumber.
 
-        raw_text = "\n\n".join(all_text)
+        Pages are streamed in windows of page_batch_size: each window is
+        opened separately so pdfplumber's parser state is released between
+        windows, text goes straight into one buffer, tables are mined for
+        financial values as they are found, and each page's parsed objects
+        are released before the next page is read.
+        """
+        text_buffer = io.StringIO()
+        all_tables = []
+        financial_data = FinancialData()
 
-        doc = Document(
+        for start, end in _page_windows(total_pages, self.page_batch_size):
+            with pdfplumber.open(pdf_path, pages=list(range(start + 1, end + 1))) as pdf:
+                for page_num, page in enumerate(pdf.pages, start):
+                    # Extract text
+                    if page_num:
+                        text_buffer.write("\n\n")
+                    text_buffer.write(page.extract_text() or "")
+
+                    # Extract tables
+                    tables = page.extract_tables()
+                    for table_idx, table in enumerate(tables):
+                        if table and len(table) > 0:
+                            # First row as headers if it looks like headers
+                            headers = table[0] if table else []
+                            rows = table[1:] if len(table) > 1 else []
+
+                            table_data = TableData(
+                                page_number=page_num,
+                                table_index=table_idx,
+                                headers=[_cell_text(h) for h in headers],
+                                rows=[
+                                    [c if c.__class__ is str else _cell_text(c) for c in row]
+                                    for row in rows
+                                ],
+                                raw_text=str(table) if keep_raw_tables else ""
+                            )
+                            all_tables.append(table_data)
+                            self._extract_from_table(table_data, financial_data)
+
+                    # Drop pdfplumber's cached layout objects for this page
+                    page.close()
+
+            if total_pages > self.page_batch_size:
+                logger.info(f"Parsed pages {start + 1}-{end} of {total_pages}")
+
+        raw_text = text_buffer.getvalue()
+
+        # Text patterns take precedence over table values, as in _extract_financial_data
+        self._extract_from_text(raw_text, financial_data)
+
+        return Document(
             file_path=str(pdf_path),
             file_name=pdf_path.name,
             total_pages=total_pages,
             parse_method="pdfplumber",
             raw_text=raw_text,
-            tables=all_tables
+            tables=all_tables,
+            financial_data=financial_data
         )
 
-        # Extract financial data from tables
-        doc.financial_data = self._extract_financial_data(doc)
-
-        return doc
-
     def _parse_scanned(self, pdf_path: Path, total_pages: int) -> Document:
-        """Parse scanned PDF using OCR."""
-        from pdf2image import convert_from_path
-        import numpy as np
+        """Parse scanned PDF using OCR (an empty document if OCR fails)."""
+        try:
+            return self._ocr_document(pdf_path, total_pages)
+        except Exception as e:
+            logger.error(f"OCR parsing error: {e}")
+            return self._scanned_document(pdf_path, total_pages, [])
 
-        all_text = []
+    def _ocr_document(self, pdf_path: Path, total_pages: int) -> Document:
+        """
+        OCR a scanned PDF.
 
-        try:
-            # Convert all pages to images
-            logger.info(f"Converting {total_pages} pages to images...")
-            images = convert_from_path(str(pdf_path), dpi=self.dpi)
+        Raises:
+            Exception: Any rendering or OCR failure, so callers can tell a
+                failed parse from a document without text
+        """
+        from pdf2image import convert_from_path
 
-            for page_num, image in enumerate(images):
-                logger.info(f"OCR processing page {page_num + 1}/{total_pages}")
-                image_array = np.array(image)
-                text = self.ocr_engine.extract_text_from_image(image_array)
-                all_text.append(text)
+        # Render pages to PNG files so OCR workers receive paths, not pixels.
+        # Rendering smaller / grayscale directly is cheaper than resizing
+        # afterwards, and OCR cost grows with pixel count.
+        dpi = max(1, round(self.dpi * self.ocr_scale))
+        logger.info(f"Converting {total_pages} pages to images (DPI: {dpi})...")
+        with tempfile.TemporaryDirectory(prefix="eagleeye_ocr_") as image_dir:
+            image_paths = convert_from_path(
+                str(pdf_path),
+                dpi=dpi,
+                grayscale=self.ocr_grayscale,
+                output_folder=image_dir,
+                fmt="png",
+                paths_only=True
+            )
+            all_text = self.ocr_engine.extract_text_from_images(image_paths)
 
-        except Exception as e:
-            logger.error(f"OCR parsing error: {e}")
+        return self._scanned_document(pdf_path, total_pages, all_text)
 
+    def _scanned_document(self, pdf_path: Path, total_pages: int, all_text: list[str]) -> Document:
+        """Build the OCR Document from per-page text."""
         raw_text = "\n\n".join(all_text)
 
         doc = Document(
@@ -203,53 +377,7 @@ class PDFParser:
 
     def _extract_from_table(self, table: TableData, data: FinancialData):
         """Extract financial values from a table."""
-        import re
-
-        def parse_number(value: str) -> Optional[float]:
-            """Parse a number from string, handling Chinese notation."""
-            if not value:
-                return None
-            # Remove commas, spaces, and convert Chinese units
-            value = value.strip().replace(",", "").replace(" ", "")
-            value = value.replace("万", "0000").replace("亿", "00000000")
-
-            try:
-                # Handle parentheses for negative numbers
-                if value.startswith("(") and value.endswith(")"):
-                    value = "-" + value[1:-1]
-                return float(value)
-            except ValueError:
-                return None
-
-        # Map common row labels to fields
-        field_mapping = {
-            "货币资金": "货币资金",
-            "应收账款": "应收账款",
-            "其他应收款": "其他应收款",
-            "预付账款": "预付账款",
-            "存货": "存货",
-            "在建工程": "在建工程",
-            "固定资产": "固定资产",
-            "无形资产": "无形资产",
-            "资产总计": "资产总额",
-            "资产合计": "资产总额",
-            "短期借款": "短期借款",
-            "长期借款": "长期借款",
-            "应付债券": "应付债券",
-            "一年内到期的非流动负债": "一年内到期的非流动负债",
-            "其他应付款": "其他应付款",
-            "递延收益": "递延收益_期末",
-            "所有者权益合计": "净资产",
-            "净资产": "净资产",
-            "营业收入": "营业收入",
-            "营业成本": "营业成本",
-            "财务费用": "财务费用_利息支出",
-            "政府补助": "营业外收入_政府补助",
-            "利润总额": "利润总额",
-            "净利润": "净利润",
-            "经营活动产生的现金流量净额": "经营活动现金流量净额",
-            "投资活动产生的现金流量净额": "投资活动现金流出",
-        }
+        match_label = _label_matcher()
 
         for row in table.rows:
             if len(row) >= 2:
@@ -257,30 +385,25 @@ class PDFParser:
                 value_str = row[-1].strip() if row[-1] else ""
 
                 # Check if label matches any known field
-                for pattern, field_name in field_mapping.items():
-                    if pattern in label:
-                        value = parse_number(value_str)
-                        if value is not None and hasattr(data, field_name):
-                            setattr(data, field_name, value)
-                        break
+                field_name = match_label(label)
+                if field_name is not None:
+                    value = _parse_number(value_str)
+                    if value is not None and hasattr(data, field_name):
+                        setattr(data, field_name, value)
 
     def _extract_from_text(self, text: str, data: FinancialData):
-        """Extract financial values from raw text using patterns."""
-        import re
-
-        # Pattern for Chinese currency amounts
-        patterns = [
-            (r"货币资金[：:\s]*([0-9,.]+)\s*(?:万|元|亿)?", "货币资金"),
-            (r"资产负债率[：:\s]*([0-9.]+)\s*%?", "资产负债率"),
-            (r"净资产收益率[：:\s]*([0-9.]+)\s*%?", "净资产收益率_ROE"),
-            (r"存货周转率[：:\s]*([0-9.]+)", "存货周转率"),
-        ]
-
-        for pattern, field_name in patterns:
-            match = re.search(pattern, text)
-            if match and hasattr(data, field_name):
+        """Extract financial values from raw text using patterns (first mention of each field wins)."""
+        seen = set()
+        for match in _TEXT_PATTERN.finditer(text):
+            group = match.lastgroup
+            if group in seen:
+                continue
+            seen.add(group)
+
+            field_name = _TEXT_FIELDS[group]
+            if hasattr(data, field_name):
                 try:
-                    value = float(match.group(1).replace(",", ""))
+                    value = float(match.group(group).replace(",", ""))
                     # Convert percentage to decimal if needed
                     if "率" in field_name and value > 1:
                         value = value / 100
@@ -288,6 +411,9 @@ class PDFParser:
                 except ValueError:
                     pass
 
+            if len(seen) == len(_TEXT_FIELDS):
+                break
+
     def extract_text_only(self, pdf_path: str | Path) -> str:
         """
         Quick text extraction without full parsing.
@@ -315,3 +441,81 @@ class PDFParser:
                 return doc.raw_text
 
             return combined
+
+
+def _evict_cached_documents(cache_dir: Path, max_entries: int):
+    """Delete the least recently written parsed documents beyond max_entries."""
+    entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith(".pkl")]
+    if len(entries) <= max_entries:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    for entry in entries[:len(entries) - max_entries]:
+        try:
+            os.unlink(entry.path)
+        except FileNotFoundError:
+            pass  # removed concurrently
+
+
+def _page_windows(total_pages: int, batch_size: int) -> list[tuple[int, int]]:
+    """Consecutive [start, end) zero-based page ranges of at most batch_size pages."""
+    return [
+        (start, min(start + batch_size, total_pages))
+        for start in range(0, total_pages, batch_size)
+    ]
+
+
+def _cell_text(cell) -> str:
+    """Table cell as text: pdfplumber gives str for text cells, None for empty ones."""
+    if cell.__class__ is str:
+        return cell
+    return str(cell) if cell else ""
+
+
+def _parse_number(value: str) -> Optional[float]:
+    """Parse a number from string, handling Chinese notation."""
+    if not value:
+        return None
+    # Remove commas and spaces
+    value = value.strip().replace(",", "").replace(" ", "")
+
+    # Handle parentheses for negative numbers
+    sign = 1.0
+    if value.startswith("(") and value.endswith(")"):
+        sign, value = -1.0, value[1:-1]
+
+    # Scale by a trailing Chinese unit (1.5万 is 15000, not 1.50000)
+    multiplier = _UNIT_MULTIPLIERS.get(value[-1:], 1.0)
+    if multiplier != 1.0:
+        value = value[:-1]
+
+    try:
+        return sign * float(value) * multiplier
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _label_matcher():
+    """Build a matcher from a table row label to its field name once."""
+    try:
+        import ahocorasick
+    except ImportError:
+        ahocorasick = None
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for order, (pattern, field_name) in enumerate(_TABLE_FIELDS.items()):
+            automaton.add_word(pattern, (order, field_name))
+        automaton.make_automaton()
+
+        def match(label: str) -> Optional[str]:
+            found = min((value for _, value in automaton.iter(label)), default=None)
+            return found[1] if found else None
+
+        return match
+
+    # pyahocorasick not installed: substring test per pattern, in listed order
+    return lambda label: next(
+        (field_name for pattern, field_name in _TABLE_FIELDS.items() if pattern in label),
+        None
+    )
@@ -4,6 +4,7 @@ Index Rules Script - Index audit rules into ChromaDB for RAG retrieval.
 """
 
 import sys
+from collections import Counter
 from pathlib import Path
 
 # Add project root to path
@@ -16,7 +17,7 @@ from eagleeye.rag.indexer import RuleIndexer
 
 
 def main():
-    """Index all rules from master rulebook."""
+    """Index all rules from master rulebook (pass --force to re-index unchanged rules)."""
     logger.info("=" * 60)
     logger.info("EagleEye Lite - Rule Indexing")
     logger.info("=" * 60)
@@ -38,7 +39,8 @@ def main():
     try:
         count = indexer.index_from_file(
             jsonl_path=rulebook_path,
-            clear_existing=True
+            clear_existing=True,
+            force="--force" in sys.argv[1:]
         )
 
         logger.info(f"Successfully indexed {count} rules")
@@ -52,13 +54,8 @@ def main():
         logger.info(f"Verification: {len(all_rules)} rules in collection")
 
         # Print rule distribution
-        categories = {}
-        priorities = {}
-        for rule in all_rules:
-            cat = rule["metadata"].get("category", "Unknown")
-            pri = rule["metadata"].get("priority", "Unknown")
-            categories[cat] = categories.get(cat, 0) + 1
-            priorities[pri] = priorities.get(pri, 0) + 1
+        categories = Counter(rule["metadata"].get("category", "Unknown") for rule in all_rules)
+        priorities = Counter(rule["metadata"].get("priority", "Unknown") for rule in all_rules)
 
         logger.info("Rule distribution by category:")
         for cat, count in sorted(categories.items()):
@@ -13,14 +13,27 @@ sys.path.insert(0, str(project_root))
 
 from loguru import logger
 from config.settings import settings
-from eagleeye.graph.workflow import run_audit, AuditWorkflowRunner
-from eagleeye.audit.reporter import AuditReporter
+from eagleeye.models.finding import ViolationSeverity
 
+# Report emojis, replaced in one str.translate pass for consoles that cannot
+# encode them; the variation selector trailing ➡️ / ⚠️ is dropped
+_EMOJI_TABLE = str.maketrans({
+    **{emoji: '*' for emoji in '🔴🟠🟡🟢⚪📈📉➡✅⚠'},
+    '\ufe0f': None
+})
 
-def setup_logging(verbose: bool = False):
-    """Configure logging."""
+# Mock audit: rule priority -> finding severity (anything else is Medium)
+_SEVERITY_MAP = {
+    "Critical": ViolationSeverity.CRITICAL,
+    "High": ViolationSeverity.HIGH,
+    "Medium": ViolationSeverity.MEDIUM,
+}
+
+
+def setup_logging(verbose: bool = False, quiet: bool = False):
+    """Configure logging (quiet keeps only warnings and errors)."""
     logger.remove()
-    level = "DEBUG" if verbose else "INFO"
+    level = "WARNING" if quiet else "DEBUG" if verbose else "INFO"
     logger.add(sys.stderr, level=level, format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | {message}")
 
 
@@ -51,6 +64,12 @@ def main():
         action="store_true",
         help="Use RAG retrieval instead of checking all rules"
     )
+    parser.add_argument(
+        "--pdf-batch-size",
+        type=int,
+        default=None,
+        help="Pages parsed per window for large PDFs (default: settings.pdf.page_batch_size)"
+    )
     parser.add_argument(
         "--json",
         action="store_true",
@@ -61,11 +80,16 @@ def main():
         action="store_true",
         help="Verbose output"
     )
+    parser.add_argument(
+        "-q", "--quiet",
+        action="store_true",
+        help="Only log warnings and print a one-line summary (for batch runs)"
+    )
 
     args = parser.parse_args()
 
     # Setup logging
-    setup_logging(args.verbose)
+    setup_logging(args.verbose, args.quiet)
 
     # Validate input
     pdf_path = Path(args.pdf_path)
@@ -78,6 +102,10 @@ def main():
     logger.info("=" * 60)
     logger.info(f"Input: {pdf_path}")
 
+    # Deferred so --help and argument errors skip the langgraph/chromadb imports
+    from eagleeye.graph.workflow import run_audit
+    from eagleeye.audit.reporter import AuditReporter
+
     # Determine check mode
     check_all = not args.rag_only
 
@@ -85,7 +113,8 @@ def main():
     try:
         result = run_audit(
             pdf_path=str(pdf_path),
-            check_all_rules=check_all
+            check_all_rules=check_all,
+            pdf_batch_size=args.pdf_batch_size
         )
 
         if not result["success"]:
@@ -139,10 +168,7 @@ def main():
                 print(result['markdown'])
             except UnicodeEncodeError:
                 # Remove emojis for Windows console compatibility
-                clean_markdown = result['markdown']
-                for emoji in ['🔴', '🟠', '🟡', '🟢', '⚪', '📈', '📉', '➡️', '✅', '⚠️']:
-                    clean_markdown = clean_markdown.replace(emoji, '*')
-                print(clean_markdown)
+                print(result['markdown'].translate(_EMOJI_TABLE))
 
     except Exception as e:
         logger.error(f"Audit error: {e}")
@@ -151,6 +177,9 @@ def main():
             traceback.print_exc()
         sys.exit(1)
 
+    if args.quiet:
+        print(f"{pdf_path}: {result['violations_found']} violations")
+
     logger.info("")
     logger.info("Audit complete!")
 
@@ -159,11 +188,15 @@ def run_mock_audit():
     """
     Run audit with mock data for testing without PDF.
     """
-    import json
+    try:
+        from orjson import loads as json_loads
+    except ImportError:
+        from json import loads as json_loads  # orjson not installed, fall back to stdlib json
     from eagleeye.models.document import FinancialData
     from eagleeye.rag.retriever import RuleRetriever
     from eagleeye.audit.evaluator import LogicEvaluator
-    from eagleeye.models.finding import Finding, ViolationSeverity
+    from eagleeye.models.finding import Finding
+    from eagleeye.audit.reporter import AuditReporter
 
     logger.info("Running mock audit with test data...")
 
@@ -173,8 +206,7 @@ def run_mock_audit():
         logger.error(f"Mock data not found: {mock_data_path}")
         return
 
-    with open(mock_data_path, "r", encoding="utf-8") as f:
-        mock_data = json.load(f)
+    mock_data = json_loads(mock_data_path.read_bytes())
 
     financial_data = mock_data["scenarios"]["violations"]["financial_data"]
 
@@ -185,31 +217,30 @@ def run_mock_audit():
 
     # Evaluate rules
     evaluator = LogicEvaluator()
-    findings = []
-
-    for rule in rules:
-        result = evaluator.evaluate(rule.logic_schema, financial_data)
-
-        if result["violation"]:
-            severity_map = {
-                "Critical": ViolationSeverity.CRITICAL,
-                "High": ViolationSeverity.HIGH,
-                "Medium": ViolationSeverity.MEDIUM,
-            }
-
-            finding = Finding(
-                rule_id=rule.rule_id,
-                rule_subject=rule.subject,
-                category=rule.category,
-                severity=severity_map.get(rule.priority, ViolationSeverity.MEDIUM),
-                logic_schema=rule.logic_schema,
-                evaluation_result=True,
-                evidence=result.get("evidence", {}),
-                description=rule.description,
-                audit_procedures=rule.audit_procedures
-            )
-            findings.append(finding)
-            logger.warning(f"Violation: {rule.rule_id} - {rule.subject}")
+    results = evaluator.evaluate_many(
+        [rule.logic_schema for rule in rules],
+        financial_data,
+        workers=settings.audit.workers
+    )
+    findings = [
+        Finding(
+            rule_id=rule.rule_id,
+            rule_subject=rule.subject,
+            category=rule.category,
+            severity=_SEVERITY_MAP.get(rule.priority, ViolationSeverity.MEDIUM),
+            logic_schema=rule.logic_schema,
+            evaluation_result=True,
+            evidence=result.get("evidence", {}),
+            description=rule.description,
+            audit_procedures=rule.audit_procedures
+        )
+        for rule, result in zip(rules, results)
+        if result["violation"]
+    ]
+    if findings:
+        logger.warning("Violations: {}", ", ".join(
+            f"{finding.rule_id} - {finding.rule_subject}" for finding in findings
+        ))
 
     # Generate report
     reporter = AuditReporter()
@@ -41,5 +41,7 @@ setup(
             "pylint>=2.17.5",
         ],
         "ocr": ["easyocr>=1.6.0"],
+        "onnx": ["optimum[onnxruntime]>=1.16.0"],
+        "fast": ["orjson>=3.9.0", "pyahocorasick>=2.0.0"],
     },
 )
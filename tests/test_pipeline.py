@@ -2,10 +2,18 @@
 Test Pipeline - Integration tests for EagleEye Lite audit workflow.
 """
 
-import json
+import hashlib
+import os
 import pytest
+import numpy as np
+from collections import Counter
 from pathlib import Path
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads  # orjson not installed, fall back to stdlib json
+
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -14,47 +22,55 @@ from eagleeye.models.rule import Rule
 from eagleeye.models.document import FinancialData, Document
 from eagleeye.models.finding import Finding, AuditReport, ViolationSeverity
 from eagleeye.rag.indexer import RuleIndexer
-from eagleeye.rag.retriever import RuleRetriever
+from eagleeye.rag.retriever import RuleRetriever, _MIN_PRUNED_RULES, _RRF_K
 from eagleeye.audit.evaluator import LogicEvaluator
 from eagleeye.audit.reporter import AuditReporter
+from eagleeye.gateway.ollama_client import LLMClient
+from eagleeye.tools.pdf_parser import PDFParser
 
 
 # Fixtures path
 FIXTURES_PATH = Path(__file__).parent / "fixtures"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_financial_data():
     """Load mock financial data from fixtures."""
-    with open(FIXTURES_PATH / "mock_financial_data.json", "r", encoding="utf-8") as f:
-        return json.load(f)
+    return json_loads((FIXTURES_PATH / "mock_financial_data.json").read_bytes())
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def violation_data(mock_financial_data):
     """Get violation scenario data."""
     return mock_financial_data["scenarios"]["violations"]["financial_data"]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def clean_data(mock_financial_data):
     """Get clean scenario data."""
     return mock_financial_data["scenarios"]["clean"]["financial_data"]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def rule_indexer():
-    """Create rule indexer instance."""
+    """Create rule indexer instance (shared by the whole session)."""
     return RuleIndexer()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def rule_retriever():
-    """Create rule retriever instance."""
+    """Create rule retriever instance (shared, so rules are loaded once)."""
     return RuleRetriever()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def all_rules(rule_retriever):
+    """All rulebook rules, loaded once and shared by the integration tests."""
+    rule_retriever.load_rules_to_cache()
+    return rule_retriever.retrieve_all_rules()
+
+
+@pytest.fixture(scope="session")
 def logic_evaluator():
     """Create logic evaluator instance."""
     return LogicEvaluator()
@@ -80,9 +96,7 @@ class TestRuleLoading:
         """Test rule categories distribution."""
         rules = rule_indexer.load_rules_from_jsonl(settings.rulebook_path)
 
-        categories = {}
-        for rule in rules:
-            categories[rule.category] = categories.get(rule.category, 0) + 1
+        categories = Counter(rule.category for rule in rules)
 
         assert "CL" in categories  # Cross-Ledger
         assert "FM" in categories  # Financial Manipulation
@@ -153,6 +167,57 @@ class TestLogicEvaluator:
         # abs(-15M - (-20M)) = abs(5M) = 5M > 1M -> violation
         assert result["violation"] is True
 
+    def test_count_condition(self, logic_evaluator):
+        """Test COUNT() only counts items matching its condition."""
+        schema = "COUNT(最近3年_经营活动现金流量净额 < 0) == 3"
+
+        violation = logic_evaluator.evaluate(schema, {"最近3年_经营活动现金流量净额": [-1, -2, -3]})
+        clean = logic_evaluator.evaluate(schema, {"最近3年_经营活动现金流量净额": [1, -2, 3]})
+
+        assert violation["violation"] is True
+        assert clean["violation"] is False
+
+    def test_compiled_schema_is_cached(self, logic_evaluator):
+        """Test repeated schemas reuse the compiled AST."""
+        schema = "净利润 < 0"
+
+        logic_evaluator.evaluate(schema, {"净利润": -1})
+        first = LogicEvaluator._compile(schema)
+        result = logic_evaluator.evaluate(schema, {"净利润": 1})
+
+        assert LogicEvaluator._compile(schema) is first
+        assert result["violation"] is False
+        assert result["evidence"] == {"净利润": 1}
+
+    def test_evaluate_many(self, logic_evaluator):
+        """Test batch evaluation matches per-schema evaluation, in order."""
+        schemas = ["净利润 < 0", "资产负债率 > 0.7", "不存在的字段 > 100"]
+        data = {"净利润": -1, "资产负债率": 0.5}
+
+        results = logic_evaluator.evaluate_many(schemas, data, workers=2)
+
+        assert results == [logic_evaluator.evaluate(s, data) for s in schemas]
+        assert [r["violation"] for r in results] == [True, False, False]
+
+    def test_evaluate_batch(self, logic_evaluator):
+        """Test vectorized evaluation matches evaluate() per schema and document."""
+        schemas = [
+            "净利润 < 0 OR 资产负债率 > 0.7",
+            "(货币资金 / 短期借款) < 0.5",
+            "COUNT(最近3年_经营活动现金流量净额 < 0) == 3",
+        ]
+        records = [
+            {"净利润": -1, "货币资金": 1, "短期借款": 0, "最近3年_经营活动现金流量净额": [-1, -2, -3]},
+            {"净利润": 1, "资产负债率": 0.5, "货币资金": 1, "短期借款": 4},
+            {"资产负债率": 0.8, "短期借款": None},
+        ]
+
+        violations = logic_evaluator.evaluate_batch(schemas, records)
+
+        assert violations.tolist() == [
+            [logic_evaluator.evaluate(s, r)["violation"] for r in records] for s in schemas
+        ]
+
 
 class TestRuleRetrieval:
     """Test RAG-based rule retrieval."""
@@ -191,6 +256,202 @@ class TestRuleRetrieval:
         assert len(critical_rules) > 0
         assert all(r.priority == "Critical" for r in critical_rules)
 
+    def test_keyword_index_matches_scan(self, rule_retriever, all_rules):
+        """Test the inverted keyword index agrees with a full Jaccard scan."""
+        postings, row_sizes = rule_retriever._keyword_index
+        for row, rule in enumerate(rule_retriever._rule_list):
+            assert row_sizes[row] == len(set(rule.trigger_keywords))
+            assert all(row in postings[kw] for kw in rule.trigger_keywords)
+
+        keywords = ["政府补助", "营业外收入", "应收账款", "不存在的关键词"]
+        expected = {}
+        for rule in all_rules:
+            shared = len(set(rule.trigger_keywords) & set(keywords))
+            if shared:
+                expected[rule.rule_id] = shared / len(set(rule.trigger_keywords) | set(keywords))
+
+        results = rule_retriever.retrieve_by_keywords(keywords, top_k=len(all_rules))
+
+        assert {rule.rule_id: pytest.approx(score) for rule, score in results} == expected
+
+    def test_fuse_ranks(self, all_rules):
+        """Test Reciprocal Rank Fusion sums weight / (k + rank) per list."""
+        a, b, c = all_rules[:3]
+
+        fused = RuleRetriever._fuse_ranks([(a, 0.9), (b, 0.8)], [(b, 1.0), (c, 0.5)], 0.7, 0.3, top_k=3)
+
+        assert [rule.rule_id for rule, _ in fused] == [b.rule_id, a.rule_id, c.rule_id]
+        assert [score for _, score in fused] == pytest.approx([
+            0.7 / (_RRF_K + 1) + 0.3 / _RRF_K,
+            0.7 / _RRF_K,
+            0.3 / (_RRF_K + 1),
+        ])
+
+    def test_pruned_search_matches_exact(self, monkeypatch):
+        """Test dimension-pruned scoring of large rulebooks returns the exact top hits."""
+        rng = np.random.default_rng(0)
+        size, dim, n_results = _MIN_PRUNED_RULES + 100, 64, 20
+        embeddings = rng.standard_normal((size, dim)).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        query = embeddings[0] + 0.5 * rng.standard_normal(dim).astype(np.float32)
+
+        indexer = RuleIndexer(collection_name="test_pruned_search")
+        indexer._embedding_function = lambda texts: np.tile(query, (len(texts), 1))
+        retriever = RuleRetriever(indexer)
+        retriever.__dict__["_rule_list"] = [Rule.model_construct(rule_id=f"R{i}") for i in range(size)]
+        retriever.__dict__["_rule_embeddings"] = (embeddings, np.ones(size, dtype=bool))
+
+        calls = []
+        pruned_scores = retriever._pruned_scores
+        monkeypatch.setattr(retriever, "_pruned_scores", lambda *args: calls.append(args) or pruned_scores(*args))
+
+        hits = retriever._search_many(["large rulebook query"], n_results)[0]
+
+        exact = embeddings @ (query / np.linalg.norm(query))
+        best = np.argsort(-exact)[:n_results]
+        assert calls
+        assert [rule_id for rule_id, _ in hits] == [f"R{i}" for i in best]
+        assert [score for _, score in hits] == pytest.approx(exact[best].tolist(), rel=1e-5)
+
+    def test_reindex_drops_cached_hits(self):
+        """Test cached search hits are not served after the collection is re-indexed."""
+        embeddings = np.eye(4, dtype=np.float32)
+        indexer = RuleIndexer(collection_name="test_reindex_cache")
+        embedded = []
+        indexer._embedding_function = lambda texts: embedded.extend(texts) or np.tile(embeddings[1], (len(texts), 1))
+        retriever = RuleRetriever(indexer)
+        retriever.__dict__["_rule_list"] = [Rule.model_construct(rule_id=f"R{i}") for i in range(4)]
+        retriever.__dict__["_rule_embeddings"] = (embeddings, np.ones(4, dtype=bool))
+
+        first = retriever._search_many(["query"], 2)[0]
+        assert retriever._search_many(["query"], 2)[0] == first
+        assert len(embedded) == 1
+
+        indexer._collection_changed()
+        retriever._search_many(["query"], 2)
+        assert len(embedded) == 2
+
+    def test_reindex_refreshes_rule_embeddings(self):
+        """Test rules deleted by a re-index are no longer scored from a stale snapshot."""
+        stored = {f"R{i}": [float(i == j) for j in range(3)] for i in range(3)}
+        indexer = RuleIndexer(collection_name="test_reindex_embeddings")
+        indexer._collection = _FakeCollection(stored)
+        indexer._embedding_function = lambda texts: np.tile([1.0, 0.5, 0.0], (len(texts), 1))
+        retriever = RuleRetriever(indexer)
+        retriever.__dict__["_rule_list"] = [Rule.model_construct(rule_id=rule_id) for rule_id in stored]
+
+        assert [rule_id for rule_id, _ in retriever._search_many(["query"], 3)[0]] == ["R0", "R1", "R2"]
+
+        del stored["R0"]
+        indexer._collection_changed()
+        assert [rule_id for rule_id, _ in retriever._search_many(["query"], 3)[0]] == ["R1", "R2"]
+
+
+class TestDiskCaches:
+    """Test the on-disk LLM verdict, parsed PDF and index fingerprint caches."""
+
+    def test_llm_rule_cache(self, tmp_path, monkeypatch):
+        """Test only parseable verdicts are cached, keyed on the prompt."""
+        monkeypatch.setattr(settings.llm, "rule_cache_dir", tmp_path)
+        client = LLMClient()
+        replies = iter(["抱歉，无法判断", '{"violation": true, "reason": "x"}', '{"violation": false}'])
+        prompts = []
+        monkeypatch.setattr(
+            client, "chat_completion", lambda messages, **kwargs: prompts.append(messages) or next(replies)
+        )
+
+        assert client.evaluate_rule("规则", "货币资金: 1", {"货币资金": 1})["violation"] is False
+        assert list(tmp_path.iterdir()) == []  # unparseable reply is not cached
+
+        assert client.evaluate_rule("规则", "货币资金: 1", {"货币资金": 1})["violation"] is True
+        assert client.evaluate_rule("规则", "货币资金: 1", {"货币资金": 1})["violation"] is True  # hit
+        assert len(prompts) == 2
+
+        # Different evidence is a different request
+        assert client.evaluate_rule("规则", "货币资金: 2", {"货币资金": 2})["violation"] is False
+        assert len(prompts) == 3
+        assert len(list(tmp_path.iterdir())) == 2
+
+    def test_pdf_parse_cache(self, tmp_path):
+        """Test parses are cached by file content, and failed or empty OCR is not."""
+        pdf_path = tmp_path / "scan.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 scanned")
+        cache_dir = tmp_path / "cache"
+        parser = PDFParser(cache_dir=cache_dir)
+        parser._detect_pdf_type = lambda path: (False, 1, "")
+        ocr_runs = []
+
+        def failing_ocr(path, total_pages):
+            ocr_runs.append(path)
+            raise MemoryError("out of memory")
+
+        parser._ocr_document = failing_ocr
+        assert parser.parse(pdf_path).raw_text == ""
+        assert not cache_dir.exists() or list(cache_dir.iterdir()) == []
+
+        def ocr(path, total_pages):
+            ocr_runs.append(path)
+            return parser._scanned_document(path, total_pages, ["货币资金 100"])
+
+        parser._ocr_document = ocr
+        assert "货币资金" in parser.parse(pdf_path).raw_text
+        assert "货币资金" in parser.parse(pdf_path).raw_text  # hit
+        assert len(ocr_runs) == 2
+
+        # Edited file: new key, parsed again
+        pdf_path.write_bytes(b"%PDF-1.4 scanned, edited" + bytes(2 << 20))
+        parser.parse(pdf_path)
+        assert len(ocr_runs) == 3
+
+        # Edits anywhere in the file count, even with size and mtime unchanged
+        stat = pdf_path.stat()
+        pdf_path.write_bytes(b"%PDF-1.4 scanned, edited" + bytes(2 << 20)[:-1] + b"x")
+        os.utime(pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        parser.parse(pdf_path)
+        assert len(ocr_runs) == 4
+
+    def test_index_fingerprint(self, monkeypatch):
+        """Test unchanged rulebooks skip re-encoding unless the embedding setup changes."""
+        indexer = RuleIndexer(collection_name="test_fingerprint")
+        data = Path(settings.rulebook_path).read_bytes()
+        stored = {
+            "metadata": {
+                "rulebook_sha256": hashlib.sha256(data).hexdigest(),
+                "embedding_model": indexer.embedding_model,
+                "embedding_backend": settings.rag.embedding_backend,
+                "embedding_dtype": settings.rag.embedding_dtype,
+            },
+            "count": 34
+        }
+        indexed = []
+        monkeypatch.setattr(indexer, "_stored_metadata", lambda: stored)
+        monkeypatch.setattr(indexer, "_index_documents", lambda docs, clear: indexed.append(docs) or len(docs))
+        monkeypatch.setattr(indexer, "_sync_documents", lambda docs: pytest.fail("backend change must re-encode"))
+        monkeypatch.setattr(RuleIndexer, "collection", property(lambda self: _FakeCollection()))
+
+        assert indexer.index_from_file() == 34
+        assert indexed == []
+
+        other_backend = "onnx" if settings.rag.embedding_backend != "onnx" else "sentence_transformers"
+        monkeypatch.setattr(settings.rag, "embedding_backend", other_backend)
+        assert indexer.index_from_file() == 34
+        assert len(indexed) == 1
+
+
+class _FakeCollection:
+    """Stand-in for a ChromaDB collection holding embeddings by rule ID."""
+
+    def __init__(self, embeddings: dict = None):
+        self.embeddings = {} if embeddings is None else embeddings
+        self.metadata = {}
+
+    def get(self, ids: list[str], include: list[str]) -> dict:
+        found = [rule_id for rule_id in ids if rule_id in self.embeddings]
+        return {"ids": found, "embeddings": [self.embeddings[rule_id] for rule_id in found]}
+
+    def modify(self, metadata: dict):
+        self.metadata = metadata
+
 
 class TestAuditReport:
     """Test audit report generation."""
@@ -260,31 +521,49 @@ class TestAuditReport:
         assert "CL-001" in markdown
         assert "测试规则" in markdown
 
+    def test_finalize_caches_serialization(self):
+        """Test finalized reports reuse serialized output until modified."""
+        finding = Finding(
+            rule_id="CL-001",
+            rule_subject="测试规则",
+            category="CL",
+            severity=ViolationSeverity.HIGH,
+            logic_schema="test > 0",
+            evaluation_result=True,
+            description="测试描述"
+        )
+        report = AuditReport(document_name="test.pdf", document_path="/path/to/test.pdf")
+        report.add_finding(finding)
+
+        report.finalize()
+        exported = report.to_json()
+        exported["document_name"] = "edited.pdf"
+        assert report.to_json()["document_name"] == "test.pdf"
+        assert report.to_markdown() is report.to_markdown()
+
+        report.add_finding(finding.model_copy(update={"rule_id": "FM-001"}))
+        assert len(report.to_json()["findings"]) == 2
+        assert "FM-001" in report.to_markdown()
+
 
 class TestIntegration:
     """Integration tests with mock data."""
 
-    def test_violation_detection(self, violation_data, rule_retriever, logic_evaluator):
+    def test_violation_detection(self, violation_data, all_rules, logic_evaluator):
         """Test that expected violations are detected."""
-        rule_retriever.load_rules_to_cache()
-        all_rules = rule_retriever.retrieve_all_rules()
-
-        detected_violations = []
-
-        for rule in all_rules:
-            result = logic_evaluator.evaluate(rule.logic_schema, violation_data)
-            if result["violation"]:
-                detected_violations.append(rule.rule_id)
+        violations = logic_evaluator.evaluate_batch(
+            [rule.logic_schema for rule in all_rules], [violation_data]
+        )
+        detected_violations = [
+            rule.rule_id for rule, violated in zip(all_rules, violations[:, 0]) if violated
+        ]
 
         # Check for expected violations (based on mock data)
         # OP-004 should definitely trigger (cash ratio < 0.5)
         assert "OP-004" in detected_violations, "OP-004 (cash coverage) should be detected"
 
-    def test_clean_data_no_violations(self, clean_data, rule_retriever, logic_evaluator):
+    def test_clean_data_no_violations(self, clean_data, all_rules, logic_evaluator):
         """Test that clean data produces fewer violations."""
-        rule_retriever.load_rules_to_cache()
-        all_rules = rule_retriever.retrieve_all_rules()
-
         violation_count = 0
 
         for rule in all_rules:
@@ -302,11 +581,7 @@ class TestFinancialDataModel:
 
     def test_from_dict(self, violation_data):
         """Test creating FinancialData from dict."""
-        financial = FinancialData(**{
-            k.replace("_", "_"): v
-            for k, v in violation_data.items()
-            if hasattr(FinancialData, k.replace("_", "_"))
-        })
+        financial = FinancialData.from_dict(violation_data)
 
         assert financial.货币资金 == 50000000
         assert financial.资产负债率 == 0.77